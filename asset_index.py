@@ -0,0 +1,199 @@
+import os
+import json
+import random
+import hashlib
+import logging
+import threading
+from PIL import Image, ImageStat
+import image_cache
+
+########################################       LOG Section      ########################################
+
+logger = logging.getLogger(__name__)
+
+########################################       PATH Section      ########################################
+
+# Verzeichnis, in dem die Indizes der Bildverzeichnisse gespeichert werden
+index_directory = 'cache/assets/'
+
+# Erkannte Bildformate; liegt dasselbe Bild in mehreren Formaten vor, gewinnt das erste in dieser Reihenfolge
+image_extensions = ('.png', '.jpg', '.jpeg', '.webp')
+
+
+##########################################################################################################
+
+########################################       METADATA Section      ########################################
+
+##########################################################################################################
+
+
+def _preferred_files(root):
+    """Gibt alle Bilder unter root zurück (pro Ordner und Dateiname ohne Endung nur das bevorzugte Format)."""
+    chosen = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            stem, extension = os.path.splitext(name)
+            extension = extension.lower()
+            if extension not in image_extensions:
+                continue
+            key = (directory, stem)
+            current = chosen.get(key)
+            if current is None or image_extensions.index(extension) < image_extensions.index(current[1]):
+                chosen[key] = (os.path.join(directory, name), extension)
+    return sorted(path for path, _ in chosen.values())
+
+
+def read_metadata(path, root):
+    """Liest Kategorie (erster Unterordner), Abmessungen, Format und mittlere Helligkeit (0-255) eines Bildes."""
+    relative = os.path.relpath(path, root)
+    category = relative.split(os.sep)[0] if os.sep in relative else ''
+    with Image.open(path) as img:
+        width, height = img.size
+        image_format = img.format
+        # Für die Helligkeit genügt eine kleine Vorschau
+        img.draft('L', (64, 64))
+        preview = img.convert('L')
+        preview.thumbnail((64, 64))
+        luminance = ImageStat.Stat(preview).mean[0]
+    stat = os.stat(path)
+    return {
+        'category': category,
+        'width': width,
+        'height': height,
+        'format': image_format,
+        'luminance': round(luminance, 1),
+        'hash': image_cache.file_hash(path),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+    }
+
+
+##########################################################################################################
+
+########################################       INDEX Section      ########################################
+
+##########################################################################################################
+
+
+class AssetIndex:
+    """Persistenter Index der Hintergrundbilder eines Verzeichnisses.
+
+    Der Index wird einmal aufgebaut und danach nur für neue oder geänderte Dateien (mtime/Größe)
+    aktualisiert. pick() wählt zufällig ohne Wiederholung: pro Kategorie wird ein gemischter Stapel
+    abgearbeitet und erst neu gemischt, wenn alle Bilder einmal dran waren.
+    """
+
+    def __init__(self, root, path=None):
+        self.root = root
+        key = hashlib.sha1(os.path.abspath(root).encode('utf-8')).hexdigest()[:10]
+        self.path = path or os.path.join(index_directory, f'index_{key}.json')
+        self.entries = {}
+        self._decks = {}
+        self._last = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Lädt Einträge und Rotationsstand von der Platte."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, mode='r', encoding='utf-8') as file:
+            data = json.load(file)
+        self.entries = data.get('entries', {})
+        self._decks = data.get('decks', {})
+        self._last = data.get('last', {})
+
+    def save(self):
+        """Speichert den Index atomar."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f'{self.path}.{os.getpid()}.tmp'
+        with self._lock:
+            data = {'root': self.root, 'entries': self.entries, 'decks': self._decks, 'last': self._last}
+            with open(temp_path, mode='w', encoding='utf-8') as file:
+                json.dump(data, file, indent=2, ensure_ascii=False, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+    def refresh(self):
+        """Gleicht den Index mit dem Verzeichnis ab; nur neue oder geänderte Bilder werden gelesen."""
+        if not os.path.isdir(self.root):
+            return 0
+        paths = _preferred_files(self.root)
+        updated = 0
+        entries = {}
+        for path in paths:
+            entry = self.entries.get(path)
+            stat = os.stat(path)
+            if entry is None or entry['mtime_ns'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+                try:
+                    entry = read_metadata(path, self.root)
+                except OSError as error:
+                    logger.warning("Bild %s kann nicht gelesen werden: %s", path, error)
+                    continue
+                updated += 1
+            entries[path] = entry
+        with self._lock:
+            if updated or entries.keys() != self.entries.keys():
+                # Stapel mit entfernten oder fehlenden Bildern verwerfen
+                self._decks = {}
+            self.entries = entries
+        if updated:
+            logger.info("Bildindex %s: %d Bilder neu eingelesen", self.root, updated)
+        return updated
+
+    def categories(self):
+        """Gibt alle Kategorien (Unterordner) des Index zurück."""
+        return sorted({entry['category'] for entry in self.entries.values()})
+
+    def images(self, category=None):
+        """Gibt die Pfade aller Bilder (optional nur einer Kategorie) zurück."""
+        return sorted(
+            path for path, entry in self.entries.items() if category is None or entry['category'] == category
+        )
+
+    def metadata(self, path):
+        """Gibt die Metadaten eines Bildes zurück (oder None)."""
+        return self.entries.get(path)
+
+    def pick(self, category=None):
+        """Wählt ein zufälliges Bild ohne Wiederholung, bis alle Bilder der Kategorie einmal gewählt wurden."""
+        deck_key = '*' if category is None else category
+        with self._lock:
+            deck = self._decks.get(deck_key)
+            if not deck:
+                deck = self.images(category)
+                if not deck:
+                    return None
+                random.shuffle(deck)
+                # Das zuletzt gewählte Bild nicht direkt wieder an den Anfang des neuen Stapels legen
+                if len(deck) > 1 and deck[-1] == self._last.get(deck_key):
+                    deck[0], deck[-1] = deck[-1], deck[0]
+                self._decks[deck_key] = deck
+            path = deck.pop()
+            self._last[deck_key] = path
+            return path
+
+
+# Ein Index pro Verzeichnis und Prozess (einmal geladen und abgeglichen)
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(root):
+    """Gibt den geladenen und aktualisierten Index eines Bildverzeichnisses zurück."""
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None:
+            index = AssetIndex(root)
+            if index.refresh() or not os.path.exists(index.path):
+                index.save()
+            _indexes[root] = index
+    return index
+
+
+def refresh_indexes():
+    """Gleicht alle in diesem Prozess geladenen Indizes erneut mit ihren Verzeichnissen ab (für langlebige Worker)."""
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        if index.refresh():
+            index.save()
@@ -0,0 +1,107 @@
+import os
+import logging
+import threading
+import subprocess
+from moviepy.config import get_setting
+import image_cache
+
+########################################       LOG Section      ########################################
+
+logger = logging.getLogger(__name__)
+
+########################################       PATH Section      ########################################
+
+# Verzeichnis für dekodierte Soundtracks und vorkodierte Segmente (Schlüssel = Inhalts-Hash)
+cache_directory = 'cache/audio/'
+
+# Dateiendungen, die als Soundtrack erkannt werden
+track_extensions = ('.mp3', '.m4a', '.aac', '.wav', '.flac', '.ogg', '.opus')
+
+# Container der Segmente je Audiocodec (muss sich per Stream-Copy in das Zielvideo übernehmen lassen)
+segment_extensions = {'aac': 'm4a', 'libopus': 'opus'}
+
+
+##########################################################################################################
+
+########################################       TRACK Section      ########################################
+
+##########################################################################################################
+
+
+def list_tracks(directory):
+    """Gibt alle Soundtracks eines Verzeichnisses sortiert zurück."""
+    if not directory or not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(track_extensions)
+    )
+
+
+def pick_track(tracks, index):
+    """Wählt reihum einen Track für das index-te Video (None, wenn es keine Tracks gibt)."""
+    if not tracks:
+        return None
+    return tracks[index % len(tracks)]
+
+
+##########################################################################################################
+
+########################################       CACHE Section      ########################################
+
+##########################################################################################################
+
+
+# Ein Lock pro Cache-Datei, damit parallele Kodierungen desselben Segments nicht doppelt arbeiten
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+def _lock_for(path):
+    with _locks_lock:
+        return _locks.setdefault(path, threading.Lock())
+
+
+def _run_ffmpeg(arguments, output_path):
+    """Schreibt output_path atomar über eine temporäre Datei mit ffmpeg."""
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    root, extension = os.path.splitext(output_path)
+    temp_path = f'{root}.{os.getpid()}.{threading.get_ident()}.tmp{extension}'
+    command = [get_setting('FFMPEG_BINARY'), '-y', '-loglevel', 'error'] + arguments + [temp_path]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise RuntimeError(f"ffmpeg konnte {output_path} nicht schreiben:\n{result.stderr}")
+    os.replace(temp_path, output_path)
+    return output_path
+
+
+def get_decoded_path(audio_path):
+    """Dekodiert einen Soundtrack einmalig zu PCM (WAV) und gibt den Pfad im Cache zurück."""
+    decoded_path = os.path.join(cache_directory, f'{image_cache.file_hash(audio_path)}.wav')
+    with _lock_for(decoded_path):
+        if not os.path.exists(decoded_path):
+            logger.info("Dekodiere Soundtrack %s", audio_path)
+            _run_ffmpeg(['-i', audio_path, '-vn', '-c:a', 'pcm_s16le'], decoded_path)
+    return decoded_path
+
+
+def get_segment(audio_path, duration, offset=0.0, codec='aac', bitrate='192k'):
+    """Gibt ein zugeschnittenes, fertig kodiertes Segment des Soundtracks zurück.
+
+    Schlüssel ist (Inhalts-Hash, Dauer, Offset, Codec, Bitrate). Das Segment wird aus dem einmal
+    dekodierten PCM geschnitten und kann per "-c:a copy" ohne erneute Kodierung gemuxt werden.
+    """
+    extension = segment_extensions.get(codec, 'mka')
+    name = f'{image_cache.file_hash(audio_path)}_{float(duration):g}_{float(offset):g}_{codec}_{bitrate}.{extension}'
+    segment_path = os.path.join(cache_directory, name)
+    with _lock_for(segment_path):
+        if not os.path.exists(segment_path):
+            decoded_path = get_decoded_path(audio_path)
+            logger.info("Kodiere Audiosegment %s (%gs ab %gs)", segment_path, duration, offset)
+            _run_ffmpeg(
+                ['-ss', str(offset), '-t', str(duration), '-i', decoded_path, '-c:a', codec, '-b:a', bitrate],
+                segment_path
+            )
+    return segment_path
@@ -0,0 +1,321 @@
+import os
+import sys
+import csv
+import json
+import time
+import shutil
+import random
+import resource
+import argparse
+import tempfile
+import statistics
+import contextlib
+import numpy as np
+from PIL import Image
+import timing
+import text_layout
+
+########################################       PATH Section      ########################################
+
+# Baseline, gegen die jeder Lauf verglichen wird
+baseline_file = 'benchmarks/baseline.json'
+
+# Mindestverschlechterung in Sekunden, ab der eine Laufzeit als Regression gilt; darunter ist der
+# relative Unterschied bei Benchmarks im Millisekundenbereich nur Messrauschen
+min_delta_seconds = 0.005
+
+# Größe der DALL·E-Hintergründe (Breite x Höhe)
+background_size = (1024, 1792)
+
+
+##########################################################################################################
+
+########################################       DATA Section      ########################################
+
+##########################################################################################################
+
+
+def make_backgrounds(directory, count=2, size=background_size, seed=0):
+    """Erzeugt synthetische Hintergründe (Verlauf + Rauschen) jeweils als WebP und PNG."""
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    width, height = size
+    gradient = np.linspace(0, 1, height, dtype=np.float32)[:, None, None]
+    paths = []
+    for index in range(count):
+        base = rng.uniform(0, 255, 3).astype(np.float32)
+        noise = rng.normal(0, 18, (height, width, 3)).astype(np.float32)
+        pixels = np.clip(base * (0.4 + 0.6 * gradient) + noise, 0, 255).astype(np.uint8)
+        img = Image.fromarray(pixels, 'RGB')
+        for extension in ('webp', 'png'):
+            path = os.path.join(directory, f'synthetic_{index}.{extension}')
+            img.save(path)
+            paths.append(path)
+    return paths
+
+
+def _sentence(rng, words=12):
+    vocabulary = ['Mut', 'Leben', 'Zukunft', 'Wissen', 'Erfolg', 'Weg', 'Frieden', 'Welt', 'Kraft', 'Zeit',
+                  'immer', 'niemals', 'gestalten', 'verändern', 'lernen', 'wachsen', 'ist', 'der', 'die', 'das']
+    return ' '.join(rng.choice(vocabulary) for _ in range(words)).capitalize() + '.'
+
+
+def make_slideshow_csv(path, rows=3, columns=8, seed=0):
+    """Erzeugt eine Slideshow-CSV (Semikolon, Kopfzeile, \\n als Text) mit rows Zeilen."""
+    rng = random.Random(seed)
+    with open(path, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file, delimiter=';')
+        writer.writerow(['Name'] + [f'Zitat {index + 1}' for index in range(columns)])
+        for row in range(rows):
+            title = f'{columns} Zitate \\n von Person {row}, \\n {_sentence(rng, 6)} \\n \\n >>> '
+            writer.writerow([title] + [_sentence(rng, rng.randint(6, 22)) for _ in range(columns)])
+    return path
+
+
+def make_quotes_csv(path, count=3, seed=0):
+    """Erzeugt eine Zitat-CSV (ein Zitat pro Zeile)."""
+    rng = random.Random(seed)
+    with open(path, mode='w', newline='', encoding='utf-8') as file:
+        csv.writer(file).writerows([_sentence(rng, rng.randint(6, 30))] for _ in range(count))
+    return path
+
+
+##########################################################################################################
+
+########################################       MEASURE Section      ########################################
+
+##########################################################################################################
+
+
+def peak_rss_mb():
+    """Gibt den maximalen Arbeitsspeicher (RSS) dieses Prozesses und seiner Kindprozesse in MB zurück.
+
+    Der Wert gilt für den gesamten Lauf, nicht pro Benchmark: eine Regression zeigt nur, dass irgendein
+    Renderpfad mehr Speicher braucht. Für die Zuordnung einen Benchmark einzeln messen (z. B. --no-video).
+    """
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # Linux meldet KB, macOS Bytes
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return max(own, children) / divisor
+
+
+def measure(func, repeat=3):
+    """Führt func mehrfach aus und gibt Median/Minimum der Laufzeit sowie die Stufen-Zeiten zurück."""
+    durations = []
+    records = []
+    for _ in range(repeat):
+        start_index = timing.record_count()
+        start = time.perf_counter()
+        # Die farbigen Log-Ausgaben der Skripte würden die Messung nur verrauschen
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            func()
+        durations.append(time.perf_counter() - start)
+        records.extend(timing.take_records(start_index))
+    stages = {name: round(entry['total'] / repeat, 4) for name, entry in timing.summarize(records).items()}
+    return {
+        'seconds': round(statistics.median(durations), 4),
+        'min_seconds': round(min(durations), 4),
+        'stages': stages,
+    }
+
+
+def run_benchmarks(rows=3, quotes=2, repeat=3, font_path=None, include_video=True):
+    """Führt alle Benchmarks in einem temporären Arbeitsverzeichnis aus und gibt die Ergebnisse zurück."""
+    import make_slideshow
+    import image_cache
+
+    results = {}
+    original_directory = os.getcwd()
+    work_directory = tempfile.mkdtemp(prefix='takeiteasy_bench_')
+    try:
+        os.chdir(work_directory)
+        backgrounds = make_backgrounds('image/bench/')
+        slideshow_csv = make_slideshow_csv('slideshow.csv', rows=rows)
+        quotes_csv = make_quotes_csv('quotes.csv', count=quotes)
+
+        make_slideshow.image_directory = 'image/bench/'
+        if font_path:
+            make_slideshow.template_parameters['text']['font_path'] = font_path
+
+        png_background = next(path for path in backgrounds if path.endswith('.png'))
+        sample_text = _sentence(random.Random(1), 20)
+        os.makedirs(make_slideshow.output_directory, exist_ok=True)
+
+        results['get_data_from_csv'] = measure(lambda: list(make_slideshow.get_data_from_csv(slideshow_csv)), repeat)
+        results['add_text_to_image'] = measure(
+            lambda: make_slideshow.add_text_to_image(png_background, sample_text, 'bench_slide.png'), repeat
+        )
+
+        def slideshow_run():
+            # Jeder Durchlauf startet ohne Manifest, damit wirklich gerendert wird
+            shutil.rmtree('cache', ignore_errors=True)
+            image_cache.memory_cache.clear()
+            make_slideshow.create_slideshow(make_slideshow.get_data_from_csv(slideshow_csv), workers=1)
+
+        results['create_slideshow'] = measure(slideshow_run, repeat)
+
+        if include_video:
+            results['create_video_with_quote'] = _measure_video(quotes_csv, png_background, repeat, font_path)
+    finally:
+        os.chdir(original_directory)
+        shutil.rmtree(work_directory, ignore_errors=True)
+
+    results['peak_rss_mb'] = round(peak_rss_mb(), 1)
+    return results
+
+
+def compare_slide_formats(repeat=3, font_path=None, limit_mb=None):
+    """Rendert eine Beispiel-Slide und vergleicht Dateigröße und Kodierzeit aller Bildformate."""
+    import make_slideshow
+    import image_encoder
+
+    work_directory = tempfile.mkdtemp(prefix='takeiteasy_formats_')
+    try:
+        background = next(path for path in make_backgrounds(work_directory, count=1) if path.endswith('.png'))
+        if font_path:
+            make_slideshow.template_parameters['text']['font_path'] = font_path
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            slide = make_slideshow.render_slide(background, _sentence(random.Random(1), 20))
+        results = image_encoder.compare_formats(slide, repeat=repeat)
+    finally:
+        shutil.rmtree(work_directory, ignore_errors=True)
+    return image_encoder.format_comparison(results, limit_mb or image_encoder.size_limit_mb)
+
+
+def _measure_video(quotes_csv, background, repeat, font_path=None):
+    """Misst create_video_with_quote für das erste Zitat der CSV (übersprungen, wenn die Abhängigkeiten fehlen).
+
+    Nur fehlende Module (moviepy, ffmpeg über imageio-ffmpeg usw.) gelten als übersprungen; jeder andere
+    Fehler ist ein echter Fehler im Renderpfad und wird weitergegeben.
+    """
+    try:
+        import make_video
+    except ImportError as error:
+        return {'skipped': f'{type(error).__name__}: {error}'}
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        _, quote = next(make_video.get_quotes_from_csv(quotes_csv))
+    os.makedirs(make_video.video_directory, exist_ok=True)
+    output_path = os.path.join(make_video.video_directory, 'bench_video.mp4')
+    # --font gilt auch für die Videovorlage, sonst scheitert der Lauf auf Rechnern ohne deren Schrift
+    template = text_layout.with_font(make_video.template_parameters, font_path)
+    return measure(
+        lambda: make_video.create_video_with_quote(quote, output_path, background, 'bench', template=template), repeat
+    )
+
+
+##########################################################################################################
+
+########################################       BASELINE Section      ########################################
+
+##########################################################################################################
+
+
+def load_baseline(path=baseline_file):
+    """Lädt die gespeicherte Baseline oder gibt None zurück."""
+    if not os.path.exists(path):
+        return None
+    with open(path, mode='r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_baseline(results, path=baseline_file):
+    """Speichert die Ergebnisse als neue Baseline."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, mode='w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2, ensure_ascii=False)
+
+
+def compare(results, baseline, tolerance=0.25, min_delta=min_delta_seconds):
+    """Vergleicht Laufzeiten und Speicher mit der Baseline und gibt die Regressionen als Textzeilen zurück.
+
+    Eine Laufzeit gilt nur als Regression, wenn sie relativ um mehr als tolerance und absolut um mehr
+    als min_delta Sekunden langsamer ist.
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if name == 'peak_rss_mb':
+            current, previous, floor = result, reference, 0
+        elif 'seconds' in result and 'seconds' in reference:
+            current, previous, floor = result['seconds'], reference['seconds'], min_delta
+        else:
+            continue
+        if previous and current > previous * (1 + tolerance) and current - previous > floor:
+            regressions.append(f'{name}: {current} statt {previous} (+{current / previous - 1:.0%})')
+    return regressions
+
+
+def format_results(results, baseline=None):
+    """Erzeugt eine Übersichtstabelle der Benchmark-Ergebnisse."""
+    lines = [f"{'Benchmark':<26}{'Median (s)':>12}{'Min (s)':>10}{'Baseline (s)':>14}"]
+    for name, result in results.items():
+        if name == 'peak_rss_mb':
+            continue
+        if 'skipped' in result:
+            lines.append(f"{name:<26}{'übersprungen':>12}  {result['skipped']}")
+            continue
+        reference = (baseline or {}).get(name, {}).get('seconds', '-')
+        lines.append(f"{name:<26}{result['seconds']:>12.3f}{result['min_seconds']:>10.3f}{reference:>14}")
+        for stage, seconds in result['stages'].items():
+            lines.append(f"  {stage:<24}{seconds:>12.3f}")
+    # Spitzenwert des ganzen Prozesses (siehe peak_rss_mb), nicht einem Benchmark zuzuordnen
+    lines.append(f"{'peak_rss_mb (gesamt)':<26}{results['peak_rss_mb']:>12.1f}{'':>10}{(baseline or {}).get('peak_rss_mb', '-'):>14}")
+    return '\n'.join(lines)
+
+
+##########################################################################################################
+
+########################################       MAIN Section      ########################################
+
+##########################################################################################################
+
+
+def main():
+    """Führt die Benchmarks aus, vergleicht sie mit der Baseline und beendet sich bei Regressionen mit Code 1."""
+    parser = argparse.ArgumentParser(description='Benchmarks für die Slideshow- und Video-Renderpfade.')
+    parser.add_argument('--rows', type=int, default=3, help='Zeilen der synthetischen Slideshow-CSV')
+    parser.add_argument('--quotes', type=int, default=2, help='Zeilen der synthetischen Zitat-CSV')
+    parser.add_argument('--repeat', type=int, default=3, help='Wiederholungen pro Benchmark')
+    parser.add_argument('--font', default=None, help='Alternative TrueType-Schrift für Slides und Video')
+    parser.add_argument('--no-video', action='store_true', help='Video-Benchmark überspringen')
+    parser.add_argument('--baseline', default=baseline_file, help='Pfad der Baseline-Datei')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Erlaubte Verschlechterung (0.25 = 25 %%)')
+    parser.add_argument(
+        '--min-delta', type=float, default=min_delta_seconds,
+        help='Mindestverschlechterung in Sekunden, ab der eine Laufzeit als Regression gilt'
+    )
+    parser.add_argument('--update-baseline', action='store_true', help='Ergebnisse als neue Baseline speichern')
+    parser.add_argument(
+        '--image-formats', action='store_true',
+        help='Nur Größe und Kodierzeit der Slide-Bildformate vergleichen (keine Baseline)'
+    )
+    parser.add_argument('--size-limit', type=float, default=None, help='Größenlimit pro Bild in MB für den Formatvergleich')
+    args = parser.parse_args()
+    # Die Benchmarks laufen in einem temporären Arbeitsverzeichnis
+    font_path = os.path.abspath(args.font) if args.font else None
+
+    if args.image_formats:
+        print(compare_slide_formats(args.repeat, font_path, args.size_limit))
+        return
+
+    results = run_benchmarks(args.rows, args.quotes, args.repeat, font_path, not args.no_video)
+    baseline = load_baseline(args.baseline)
+    print(format_results(results, baseline))
+
+    if args.update_baseline or baseline is None:
+        save_baseline(results, args.baseline)
+        print(f"\nBaseline gespeichert unter: {args.baseline}")
+        return
+
+    regressions = compare(results, baseline, args.tolerance, args.min_delta)
+    if regressions:
+        print("\nRegressionen gegenüber der Baseline:\n" + '\n'.join(regressions))
+        sys.exit(1)
+    print("\nKeine Regressionen gegenüber der Baseline.")
+
+
+if __name__ == "__main__":
+    main()
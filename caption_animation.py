@@ -0,0 +1,160 @@
+from collections import namedtuple
+from functools import lru_cache
+import numpy as np
+from PIL import Image, ImageDraw
+import text_layout
+
+########################################       EFFECT Section      ########################################
+
+# Verfügbare Animationen: ganze Bildunterschrift einblenden, Wort für Wort, Zeichen für Zeichen
+effects = ('fade', 'words', 'typewriter')
+
+
+##########################################################################################################
+
+########################################       MASK Section      ########################################
+
+##########################################################################################################
+
+
+# Ein animierter Teil der Bildunterschrift: Position im Frame, Alpha-Maske (0-1) und Zeitpunkt des Einblendens
+CaptionPiece = namedtuple('CaptionPiece', ['y', 'x', 'mask', 'start', 'fade'])
+
+
+@lru_cache(maxsize=256)
+def _line_mask(text, font_path, font_size):
+    """Rastert eine Zeile einmal als Alpha-Maske (float32, 0-1) in der Größe ihrer Bounding-Box.
+
+    Wie in text_layout.render_caption wird um den Rand der Bounding-Box verschoben, damit auch Glyphen
+    links vom Ursprung der Schrift (z. B. das "j") vollständig in der Maske liegen.
+    """
+    font = text_layout.get_font(font_path, font_size)
+    left, top, right, bottom = font.getbbox(text)
+    mask = Image.new('L', (max(1, right - left), max(1, bottom - top)), 0)
+    ImageDraw.Draw(mask).text((-left, -top), text, font=font, fill=255)
+    return np.asarray(mask, dtype=np.float32) / 255.0
+
+
+def _split_columns(text, font_path, font_size, boundaries, mask_width):
+    """Teilt eine Zeile an Zeichenpositionen in aneinandergrenzende Spaltenbereiche (x0, x1) der Maske auf."""
+    font = text_layout.get_font(font_path, font_size)
+    left = font.getbbox(text)[0]
+    edges = [0] + [
+        min(max(round(font.getlength(text[:index])) - left, 0), mask_width) for index in boundaries[1:]
+    ] + [mask_width]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def build_pieces(text, font_path, font_size, area, effect='words', start=0.0, word_interval=0.35,
+                 chars_per_second=18.0, fade=0.25, line_padding=10, min_font_size=12):
+    """Zerlegt eine Bildunterschrift in vorgerenderte Masken mit Einblendzeitpunkten.
+
+    area ist (x, y, Breite, Höhe) des Textbereichs im Frame; der Text wird darin umgebrochen, bei Bedarf
+    bis min_font_size verkleinert sowie horizontal und vertikal zentriert (wie text_layout.render_caption). Jede Zeile wird nur einmal gerastert; Wörter und Zeichen sind
+    Spaltenausschnitte dieser Zeilenmaske.
+    """
+    if effect not in effects:
+        raise ValueError(f"Unbekannter Effekt: {effect} (verfügbar: {', '.join(effects)})")
+
+    area_x, area_y, area_width, area_height = area
+    font_size, layout = text_layout.fit_text(
+        text, font_path, font_size, area_width, area_height, line_padding, min_font_size
+    )
+    lines = [line for line in layout.lines if line.text]
+    if not lines:
+        return []
+    top = area_y + max(0, (area_height - text_layout.block_height(layout)) // 2)
+
+    pieces = []
+    time_cursor = start
+    for line in lines:
+        mask = _line_mask(line.text, font_path, font_size)
+        left = area_x + (area_width - line.width) // 2
+        y = top + line.y
+
+        if effect == 'fade':
+            pieces.append(CaptionPiece(y, left, mask, start, fade))
+            continue
+
+        if effect == 'words':
+            # Startindex jedes Wortes in der Zeile
+            boundaries = []
+            position = 0
+            for word in line.text.split(' '):
+                boundaries.append(position)
+                position += len(word) + 1
+            interval = word_interval
+        else:
+            boundaries = list(range(len(line.text)))
+            interval = 1.0 / chars_per_second
+
+        for x0, x1 in _split_columns(line.text, font_path, font_size, boundaries, mask.shape[1]):
+            if x1 > x0:
+                pieces.append(CaptionPiece(y, left + x0, mask[:, x0:x1], time_cursor, fade))
+            time_cursor += interval
+    return pieces
+
+
+##########################################################################################################
+
+########################################       FRAME Section      ########################################
+
+##########################################################################################################
+
+
+def _alpha_at(piece, t):
+    if t < piece.start:
+        return 0.0
+    if piece.fade <= 0:
+        return 1.0
+    return min(1.0, (t - piece.start) / piece.fade)
+
+
+def caption_frames(background, pieces, color, fps, duration):
+    """Erzeugt die Frames einer animierten Bildunterschrift über einem fertig zusammengesetzten Hintergrund.
+
+    Pro Frame werden nur die Masken aktualisiert, deren Deckkraft sich ändert, und nur der Textbereich
+    wird per NumPy-Alpha-Blending neu berechnet. Ändert sich nichts, wird das vorherige Frame erneut
+    geliefert. Der Speicherbedarf hängt nicht von der Videolänge ab.
+    """
+    frame_count = max(1, round(duration * fps))
+    if not pieces:
+        for _ in range(frame_count):
+            yield background
+        return
+
+    # Gemeinsamer Bereich aller Masken; nur dieser Ausschnitt wird pro Frame neu gemischt
+    height, width = background.shape[:2]
+    top = max(0, min(piece.y for piece in pieces))
+    left = max(0, min(piece.x for piece in pieces))
+    bottom = min(height, max(piece.y + piece.mask.shape[0] for piece in pieces))
+    right = min(width, max(piece.x + piece.mask.shape[1] for piece in pieces))
+
+    region = background[top:bottom, left:right].astype(np.float32)
+    # frame = Hintergrund + (Textfarbe - Hintergrund) * Alpha
+    difference = np.asarray(color, dtype=np.float32) - region
+    alpha = np.zeros(region.shape[:2], dtype=np.float32)
+    levels = [None] * len(pieces)
+
+    frame = background
+    for index in range(frame_count):
+        t = index / fps
+        changed = False
+        for piece_index, piece in enumerate(pieces):
+            level = _alpha_at(piece, t)
+            if level == levels[piece_index]:
+                continue
+            levels[piece_index] = level
+            changed = True
+            # Maske auf den gemeinsamen Bereich (und den Bildrand) zuschneiden
+            y0, x0 = piece.y - top, piece.x - left
+            y1 = min(y0 + piece.mask.shape[0], alpha.shape[0])
+            x1 = min(x0 + piece.mask.shape[1], alpha.shape[1])
+            target = alpha[max(y0, 0):y1, max(x0, 0):x1]
+            # Deckkräfte steigen nur an; das Maximum erhält Unterlängen, die in die nächste Zeile ragen
+            np.maximum(target, level * piece.mask[max(-y0, 0):y1 - y0, max(-x0, 0):x1 - x0], out=target)
+        if changed:
+            # Neues Array, da die bisherigen Frames noch im Puffer des Encoders liegen können
+            frame = background.copy()
+            frame[top:bottom, left:right] = (region + difference * alpha[..., None] + 0.5).astype(np.uint8)
+        yield frame
@@ -0,0 +1,124 @@
+import re
+import csv
+import time
+import hashlib
+import logging
+import argparse
+from collections import Counter
+import timing
+
+########################################       LOG Section      ########################################
+
+logger = logging.getLogger(__name__)
+
+########################################       RULE Section      ########################################
+
+# Maximale Länge eines Textes; längere Zellen stammen meist von einem nicht geschlossenen Anführungszeichen
+max_text_length = 1000
+
+# "\n" als Text oder echter Zeilenumbruch, jeweils samt umgebender Leerzeichen
+_line_break = re.compile(r'[ \t]*(?:\\n|\r?\n)[ \t]*')
+
+
+##########################################################################################################
+
+########################################       SHARD Section      ########################################
+
+##########################################################################################################
+
+
+def parse_shard(value):
+    """Liest eine Shard-Angabe "i/n" (i von 1 bis n) und gibt (i - 1, n) zurück."""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Shard muss die Form i/n haben, nicht {value!r}")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"Shard {value} liegt nicht zwischen 1/{count} und {count}/{count}")
+    return index - 1, count
+
+
+def add_shard_argument(parser):
+    """Fügt einem argparse-Parser die Option --shard hinzu."""
+    parser.add_argument(
+        '--shard', type=parse_shard, default=None,
+        help='Nur den i-ten von n Teilen der CSV rendern (z. B. 2/4), um eine große CSV auf Rechner zu verteilen'
+    )
+
+
+##########################################################################################################
+
+########################################       READ Section      ########################################
+
+##########################################################################################################
+
+
+def normalize_text(text):
+    """Ersetzt "\\n" durch echte Zeilenumbrüche und entfernt Leerzeichen um Umbrüche und am Rand."""
+    return _line_break.sub('\n', text).strip()
+
+
+def iter_records(csv_file, delimiter=',', skip_header=False, shard=None, dedupe=True, stats=None):
+    """Liest eine CSV zeilenweise und liefert (Index, Zellen) für jede gültige Zeile, ohne die Datei ganz zu laden.
+
+    Die Zellen sind normalisiert (siehe normalize_text), leere Zellen am Zeilenende entfallen. Leere
+    Zeilen und Zeilen mit überlangen Zellen werden übersprungen, ebenso (mit dedupe) inhaltlich doppelte
+    Zeilen. Mit shard = (i, n) wird nur jede Zeile geliefert, deren Inhalts-Hash modulo n gleich i ist;
+    gleiche Zeilen landen so immer im selben Shard. Der Index zählt alle Datenzeilen der Datei und ist
+    daher unabhängig von Shard und Duplikaten. stats (ein Counter) wird unterwegs mitgezählt.
+    """
+    stats = Counter() if stats is None else stats
+    seen = set()
+    elapsed = 0.0
+    try:
+        with open(csv_file, mode='r', newline='', encoding='utf-8') as file:
+            reader = csv.reader(file, delimiter=delimiter)
+            start = time.perf_counter()
+            if skip_header:
+                next(reader, None)
+            for index, row in enumerate(reader):
+                cells = [normalize_text(cell) for cell in row]
+                while cells and not cells[-1]:
+                    cells.pop()
+                stats['rows'] += 1
+                if not cells:
+                    stats['blank'] += 1
+                    continue
+                if any(len(cell) > max_text_length for cell in cells):
+                    stats['invalid'] += 1
+                    logger.warning("%s, Zeile %d: Text länger als %d Zeichen, übersprungen",
+                                   csv_file, reader.line_num, max_text_length)
+                    continue
+
+                digest = hashlib.sha1('\x1f'.join(cells).encode('utf-8')).digest()
+                if shard and int.from_bytes(digest[:8], 'big') % shard[1] != shard[0]:
+                    stats['other_shard'] += 1
+                    continue
+                if dedupe:
+                    if digest in seen:
+                        stats['duplicate'] += 1
+                        continue
+                    seen.add(digest)
+
+                stats['accepted'] += 1
+                elapsed += time.perf_counter() - start
+                yield index, cells
+                start = time.perf_counter()
+            elapsed += time.perf_counter() - start
+    except csv.Error as error:
+        raise ValueError(f"{csv_file}, Zeile {reader.line_num}: {error}") from error
+    finally:
+        # Nur die Lesezeit zählt, nicht das Rendern zwischen zwei Zeilen
+        timing.record('csv_load', elapsed)
+
+
+def format_stats(stats):
+    """Fasst die Zählung von iter_records in einem Satz zusammen."""
+    skipped = [
+        f"{stats[key]} {label}" for key, label in
+        (('blank', 'leer'), ('invalid', 'ungültig'), ('duplicate', 'doppelt'), ('other_shard', 'anderer Shard'))
+        if stats[key]
+    ]
+    return f"{stats['accepted']} von {stats['rows']} Zeilen übernommen" + (
+        f" (übersprungen: {', '.join(skipped)})" if skipped else ''
+    )
@@ -1,8 +1,168 @@
-import boto3
+import os
+import time
+import queue
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Übertragungseinstellungen: ab 8 MB Multipart in 8-MB-Teilen, bis zu 10 Teile gleichzeitig pro Datei
+multipart_threshold = int(os.getenv('S3_MULTIPART_THRESHOLD', 8 * 1024 * 1024))
+multipart_chunksize = int(os.getenv('S3_MULTIPART_CHUNKSIZE', 8 * 1024 * 1024))
+max_concurrency = int(os.getenv('S3_MAX_CONCURRENCY', 10))
+
+# boto3 wird erst beim ersten Upload geladen, damit Läufe ohne Upload nicht auf den Import warten
+_client = None
+_transfer_config = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Gibt den gemeinsamen S3-Client zurück (S3_ENDPOINT_URL z. B. für MinIO oder moto)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            import boto3
+            _client = boto3.client('s3', endpoint_url=os.getenv('S3_ENDPOINT_URL') or None)
+    return _client
+
+
+def get_transfer_config():
+    """Gibt die gemeinsamen Übertragungseinstellungen zurück."""
+    global _transfer_config
+    with _client_lock:
+        if _transfer_config is None:
+            from boto3.s3.transfer import TransferConfig
+            _transfer_config = TransferConfig(
+                multipart_threshold=multipart_threshold,
+                multipart_chunksize=multipart_chunksize,
+                max_concurrency=max_concurrency,
+                use_threads=True,
+            )
+    return _transfer_config
 
-s3 = boto3.client('s3')
 
 def upload_to_s3(file_name, bucket, object_name=None):
     if object_name is None:
         object_name = file_name
-    s3.upload_file(file_name, bucket, object_name)
+    get_client().upload_file(file_name, bucket, object_name, Config=get_transfer_config())
+
+
+def local_etag(file_name, threshold=multipart_threshold, chunksize=multipart_chunksize):
+    """Berechnet den ETag, den S3 für diese Datei mit den obigen Multipart-Einstellungen vergeben würde."""
+    part_digests = []
+    with open(file_name, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunksize), b''):
+            part_digests.append(hashlib.md5(chunk))
+
+    if os.path.getsize(file_name) < threshold:
+        digest = part_digests[0].hexdigest() if part_digests else hashlib.md5(b'').hexdigest()
+        return f'"{digest}"'
+    combined = hashlib.md5(b''.join(part.digest() for part in part_digests))
+    return f'"{combined.hexdigest()}-{len(part_digests)}"'
+
+
+def is_already_uploaded(file_name, bucket, object_name, client=None):
+    """Prüft, ob das Objekt bereits mit identischem Inhalt (ETag/MD5) im Bucket liegt."""
+    from botocore.exceptions import ClientError
+
+    client = client or get_client()
+    try:
+        head = client.head_object(Bucket=bucket, Key=object_name)
+    except ClientError as error:
+        if error.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+            return False
+        raise
+    return head.get('ContentLength') == os.path.getsize(file_name) and head.get('ETag') == local_etag(file_name)
+
+
+class S3BatchUploader:
+    """Lädt Dateien im Hintergrund hoch, während weitergerendert wird.
+
+    submit() legt eine Datei in eine begrenzte Warteschlange (blockiert, wenn sie voll ist);
+    mehrere Threads laden parallel hoch und überspringen Dateien, deren ETag schon passt.
+    close() wartet auf alle Uploads und gibt pro Datei ein Ergebnis-Dict zurück.
+    """
+
+    def __init__(self, bucket, prefix='', workers=4, queue_size=16, client=None):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = client or get_client()
+        self.results = []
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, file_name, object_name=None):
+        """Reiht eine Datei zum Hochladen ein."""
+        if object_name is None:
+            object_name = self.prefix + os.path.basename(file_name)
+        self._queue.put((file_name, object_name))
+
+    def close(self):
+        """Wartet, bis alle eingereihten Dateien hochgeladen sind, und gibt die Ergebnisse zurück."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        return self.results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            result = self._upload(*item)
+            with self._lock:
+                self.results.append(result)
+
+    def _upload(self, file_name, object_name):
+        result = {'file': file_name, 'key': object_name, 'bytes': 0, 'seconds': 0.0, 'status': 'uploaded'}
+        start = time.perf_counter()
+        try:
+            # Auch eine fehlende Datei muss als Fehler im Ergebnis landen, sonst stirbt der Thread
+            size = result['bytes'] = os.path.getsize(file_name)
+            if is_already_uploaded(file_name, self.bucket, object_name, self.client):
+                result['status'] = 'skipped'
+            else:
+                self.client.upload_file(file_name, self.bucket, object_name, Config=get_transfer_config())
+        except Exception as error:
+            result['status'] = 'failed'
+            result['error'] = str(error)
+        result['seconds'] = time.perf_counter() - start
+        if result['status'] == 'uploaded':
+            result['mb_per_s'] = size / (1024 * 1024) / max(result['seconds'], 1e-9)
+            logger.info("Hochgeladen: %s -> s3://%s/%s (%.1f MB/s)", file_name, self.bucket, object_name, result['mb_per_s'])
+        return result
+
+
+def failed_uploads(results):
+    """Gibt die fehlgeschlagenen Uploads aus den Ergebnissen von S3BatchUploader.close() zurück."""
+    return [result for result in results if result['status'] == 'failed']
+
+
+def format_upload_report(results):
+    """Erzeugt eine Übersicht der Uploads mit Durchsatz pro Datei."""
+    lines = [f"{'Datei':<60}{'Status':>10}{'MB':>9}{'s':>8}{'MB/s':>8}"]
+    for result in results:
+        lines.append(
+            f"{os.path.basename(result['file']):<60}{result['status']:>10}{result['bytes'] / (1024 * 1024):>9.2f}"
+            f"{result['seconds']:>8.2f}{result.get('mb_per_s', 0.0):>8.1f}"
+        )
+    return '\n'.join(lines)
+
+
+def add_upload_arguments(parser):
+    """Fügt einem argparse-Parser die Upload-Optionen hinzu."""
+    parser.add_argument('--upload-bucket', default=None, help='Fertige Dateien während des Renderns in diesen S3-Bucket hochladen')
+    parser.add_argument('--upload-prefix', default='', help='Präfix für die S3-Schlüssel')
+    parser.add_argument('--upload-workers', type=int, default=4, help='Anzahl gleichzeitiger Uploads')
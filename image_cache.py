@@ -0,0 +1,163 @@
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from PIL import Image, ImageOps
+
+########################################       LOG Section      ########################################
+
+logger = logging.getLogger(__name__)
+
+########################################       PATH Section      ########################################
+
+# Verzeichnis für konvertierte und normalisierte Bild-Derivate (Schlüssel = Inhalts-Hash)
+cache_directory = 'cache/images/'
+
+# Maximaler Speicher für dekodierte Bilder im Prozess (in Bytes)
+max_memory_bytes = int(os.getenv('IMAGE_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+
+##########################################################################################################
+
+########################################       HASH Section      ########################################
+
+##########################################################################################################
+
+
+# (Pfad, mtime, Größe) -> Inhalts-Hash, damit große Dateien nicht bei jedem Aufruf neu gehasht werden
+_hash_memo = {}
+_hash_lock = threading.Lock()
+
+
+def file_hash(path):
+    """Berechnet den SHA-256-Inhalts-Hash einer Datei (gemerkt über Pfad, mtime und Größe)."""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _hash_lock:
+        if key in _hash_memo:
+            return _hash_memo[key]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    content_hash = digest.hexdigest()
+
+    with _hash_lock:
+        _hash_memo[key] = content_hash
+    return content_hash
+
+
+##########################################################################################################
+
+########################################       MEMORY Section      ########################################
+
+##########################################################################################################
+
+
+def _image_size_in_bytes(img):
+    """Schätzt den Speicherbedarf eines dekodierten Bildes."""
+    return img.width * img.height * len(img.getbands())
+
+
+class ImageLRUCache:
+    """LRU-Cache für dekodierte PIL-Bilder mit Obergrenze für den Speicherverbrauch."""
+
+    def __init__(self, max_bytes=max_memory_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Gibt das Bild zum Schlüssel zurück oder None."""
+        with self._lock:
+            img = self._images.get(key)
+            if img is None:
+                self.misses += 1
+                return None
+            self._images.move_to_end(key)
+            self.hits += 1
+            return img
+
+    def put(self, key, img):
+        """Legt ein Bild ab und verdrängt die am längsten nicht benutzten Einträge."""
+        size = _image_size_in_bytes(img)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._images:
+                self.current_bytes -= _image_size_in_bytes(self._images.pop(key))
+            self._images[key] = img
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self.current_bytes -= _image_size_in_bytes(evicted)
+
+    def clear(self):
+        """Leert den Cache."""
+        with self._lock:
+            self._images.clear()
+            self.current_bytes = 0
+
+
+# Prozessweiter Cache für dekodierte Bilder
+memory_cache = ImageLRUCache()
+
+
+##########################################################################################################
+
+########################################       DISK Section      ########################################
+
+##########################################################################################################
+
+
+def get_derivative_path(image_path, fmt='png', mode=None, size=None):
+    """Gibt den Pfad eines auf der Platte gecachten Derivats zurück und erzeugt es bei Bedarf.
+
+    Mit size (Breite, Höhe) wird das Bild mittig auf das Seitenverhältnis zugeschnitten und skaliert.
+    """
+    content_hash = file_hash(image_path)
+    suffix = f'_{mode}' if mode else ''
+    if size:
+        suffix += f'_{size[0]}x{size[1]}'
+    derivative_path = os.path.join(cache_directory, f'{content_hash}{suffix}.{fmt}')
+
+    if os.path.exists(derivative_path):
+        return derivative_path
+
+    os.makedirs(cache_directory, exist_ok=True)
+    img = load_image(image_path)
+    if mode and img.mode != mode:
+        img = img.convert(mode)
+    if size and img.size != tuple(size):
+        img = ImageOps.fit(img, tuple(size), Image.LANCZOS)
+
+    # Erst in eine temporäre Datei schreiben, damit parallele Prozesse nie halbe Dateien lesen
+    temp_path = f'{derivative_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    img.save(temp_path, format=fmt.upper())
+    os.replace(temp_path, derivative_path)
+
+    # Das Derivat ist bereits dekodiert, also direkt im Speicher-Cache ablegen
+    memory_cache.put(file_hash(derivative_path), img)
+    logger.info("Bild-Derivat erzeugt: %s -> %s", image_path, derivative_path)
+    return derivative_path
+
+
+def get_canvas_image(image_path, size):
+    """Gibt den Pfad eines auf die Zielgröße (Breite, Höhe) zugeschnittenen RGB-PNG-Derivats zurück."""
+    return get_derivative_path(image_path, fmt='png', mode='RGB', size=size)
+
+
+def load_image(image_path):
+    """Lädt ein Bild dekodiert aus dem Speicher-Cache (der Inhalt darf nicht verändert werden)."""
+    key = file_hash(image_path)
+    img = memory_cache.get(key)
+    if img is None:
+        with Image.open(image_path) as source:
+            img = source.copy()
+        memory_cache.put(key, img)
+    return img
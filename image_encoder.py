@@ -0,0 +1,158 @@
+import io
+import os
+import time
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import timing
+
+########################################       FORMAT Section      ########################################
+
+# Ein Ausgabeformat für Einzelbilder: Pillow-Format, Dateiendung und Optionen für Image.save
+ImageFormat = namedtuple('ImageFormat', ['name', 'pil_format', 'extension', 'options'])
+
+# Verfügbare Formate; compress_level (PNG, 0-9) und quality (JPEG/WebP, 1-100) lassen sich überschreiben
+image_formats = {
+    # Pillow-Standard; compress_level 1 ist deutlich schneller bei kaum größeren Dateien
+    'png': ImageFormat('png', 'PNG', 'png', {'compress_level': 6}),
+    'jpeg': ImageFormat('jpeg', 'JPEG', 'jpg', {'quality': 90}),
+    'webp': ImageFormat('webp', 'WEBP', 'webp', {'quality': 85, 'method': 4}),
+    # quality steuert bei verlustfreiem WebP den Aufwand; 0 und method 0 sind am schnellsten
+    'webp_lossless': ImageFormat('webp_lossless', 'WEBP', 'webp', {'lossless': True, 'quality': 0, 'method': 0}),
+}
+
+# Anzahl der Threads, die Bilder im Hintergrund kodieren (Pillow gibt beim Kodieren den GIL frei)
+encode_threads = int(os.getenv('IMAGE_ENCODE_THREADS', 2))
+
+# Größenlimit für den Formatvergleich in MB (z. B. für Bild-Posts auf Instagram)
+size_limit_mb = 8.0
+
+
+##########################################################################################################
+
+########################################       ENCODE Section      ########################################
+
+##########################################################################################################
+
+
+def get_format(name='png', quality=None, compress_level=None):
+    """Gibt ein Ausgabeformat zurück, optional mit eigener Qualität (JPEG/WebP) bzw. Kompressionsstufe (PNG)."""
+    if name not in image_formats:
+        raise ValueError(f"Unbekanntes Bildformat: {name} (verfügbar: {', '.join(image_formats)})")
+    image_format = image_formats[name]
+    options = dict(image_format.options)
+    if quality is not None and image_format.pil_format in ('JPEG', 'WEBP'):
+        options['quality'] = quality
+    if compress_level is not None and image_format.pil_format == 'PNG':
+        options['compress_level'] = compress_level
+    return image_format._replace(options=options)
+
+
+def encode_image(img, image_format):
+    """Kodiert ein Bild im Speicher und gibt die Bytes zurück."""
+    if image_format.pil_format == 'JPEG' and img.mode != 'RGB':
+        img = img.convert('RGB')
+    buffer = io.BytesIO()
+    img.save(buffer, format=image_format.pil_format, **image_format.options)
+    return buffer.getvalue()
+
+
+def save_image(img, path, image_format):
+    """Kodiert ein Bild und schreibt es atomar (parallele Leser sehen nie eine halbe Datei)."""
+    with timing.stage('save'):
+        data = encode_image(img, image_format)
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp_path, mode='wb') as file:
+            file.write(data)
+        os.replace(temp_path, path)
+    return path
+
+
+class ImageWriter:
+    """Kodiert und speichert Bilder in einem Thread-Pool, während der Aufrufer schon das nächste Bild setzt.
+
+    Die übergebenen Bilder dürfen danach nicht mehr verändert werden. wait() (bzw. das Verlassen des
+    with-Blocks) wartet auf alle Dateien und gibt den ersten Fehler weiter.
+    """
+
+    def __init__(self, workers=None):
+        self._executor = ThreadPoolExecutor(max_workers=workers or encode_threads)
+        self._futures = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.wait()
+        self._executor.shutdown(wait=True)
+
+    def save(self, img, path, image_format):
+        """Speichert ein Bild im Hintergrund; gibt ein Future mit dem Pfad zurück."""
+        future = self._executor.submit(save_image, img, path, image_format)
+        self._futures.append(future)
+        return future
+
+    def encode(self, img, image_format):
+        """Kodiert ein Bild im Hintergrund; gibt ein Future mit den Bytes zurück."""
+        future = self._executor.submit(encode_image, img, image_format)
+        self._futures.append(future)
+        return future
+
+    def wait(self):
+        """Wartet auf alle eingereichten Bilder und gibt die Ergebnisse in Reihenfolge zurück."""
+        futures, self._futures = self._futures, []
+        return [future.result() for future in futures]
+
+
+def add_format_arguments(parser, default='png'):
+    """Fügt einem argparse-Parser die Optionen für das Bildformat hinzu."""
+    parser.add_argument(
+        '--image-format', choices=image_formats, default=default,
+        help=f"Format der Einzelbilder ({', '.join(image_formats)})"
+    )
+    parser.add_argument('--quality', type=int, default=None, help='Qualität für JPEG/WebP (1-100)')
+    parser.add_argument('--compress-level', type=int, default=None, help='Kompressionsstufe für PNG (0-9)')
+
+
+def format_from_args(args):
+    """Gibt das über add_format_arguments gewählte Format zurück."""
+    return get_format(args.image_format, args.quality, args.compress_level)
+
+
+##########################################################################################################
+
+########################################       REPORT Section      ########################################
+
+##########################################################################################################
+
+
+def compare_formats(img, formats=None, repeat=3):
+    """Kodiert ein Bild in mehreren Formaten und gibt pro Format Größe (Bytes) und beste Zeit (s) zurück."""
+    results = []
+    for image_format in formats or [get_format(name) for name in image_formats]:
+        seconds = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            data = encode_image(img, image_format)
+            seconds.append(time.perf_counter() - start)
+        results.append({
+            'format': image_format.name,
+            'options': image_format.options,
+            'bytes': len(data),
+            'seconds': round(min(seconds), 4),
+        })
+    return results
+
+
+def format_comparison(results, limit_mb=size_limit_mb):
+    """Erzeugt eine Tabelle aus compare_formats; Formate über dem Größenlimit werden markiert."""
+    lines = [f"{'Format':<16}{'Größe (KB)':>12}{'Zeit (s)':>10}  Optionen"]
+    for result in sorted(results, key=lambda result: result['seconds']):
+        over_limit = result['bytes'] > limit_mb * 1024 * 1024
+        options = ', '.join(f'{key}={value}' for key, value in result['options'].items())
+        lines.append(
+            f"{result['format']:<16}{result['bytes'] / 1024:>12.0f}{result['seconds']:>10.3f}  {options}"
+            + (f'  (über {limit_mb:g} MB)' if over_limit else '')
+        )
+    return '\n'.join(lines)
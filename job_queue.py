@@ -0,0 +1,91 @@
+import os
+import json
+import time
+import sqlite3
+
+########################################       PATH Section      ########################################
+
+# Lokale Warteschlange der Render-Jobs (SQLite, von mehreren Prozessen gleichzeitig nutzbar)
+queue_file = 'cache/jobs.sqlite'
+
+
+##########################################################################################################
+
+########################################       QUEUE Section      ########################################
+
+##########################################################################################################
+
+
+def connect(path=queue_file):
+    """Öffnet die Warteschlange und legt die Tabelle bei Bedarf an."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # isolation_level=None: Transaktionen werden unten explizit gesteuert
+    connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+    connection.row_factory = sqlite3.Row
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute(
+        'CREATE TABLE IF NOT EXISTS jobs ('
+        ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+        ' type TEXT NOT NULL,'
+        ' arguments TEXT NOT NULL,'
+        " status TEXT NOT NULL DEFAULT 'queued',"
+        ' attempts INTEGER NOT NULL DEFAULT 0,'
+        ' error TEXT,'
+        ' created_at REAL NOT NULL,'
+        ' started_at REAL,'
+        ' finished_at REAL)'
+    )
+    connection.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id)')
+    return connection
+
+
+def enqueue(connection, job_type, arguments=()):
+    """Reiht einen Job (Typ + Kommandozeilen-Argumente) ein und gibt seine ID zurück."""
+    cursor = connection.execute(
+        'INSERT INTO jobs (type, arguments, created_at) VALUES (?, ?, ?)',
+        (job_type, json.dumps(list(arguments)), time.time())
+    )
+    return cursor.lastrowid
+
+
+def claim(connection):
+    """Holt den ältesten wartenden Job und markiert ihn als laufend; gibt (ID, Typ, Argumente) oder None zurück."""
+    # BEGIN IMMEDIATE sperrt für Schreiber, damit zwei Worker nie denselben Job bekommen
+    connection.execute('BEGIN IMMEDIATE')
+    try:
+        row = connection.execute(
+            "SELECT id, type, arguments FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+        ).fetchone()
+        if row is not None:
+            connection.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ? WHERE id = ?",
+                (time.time(), row['id'])
+            )
+        connection.execute('COMMIT')
+    except Exception:
+        connection.execute('ROLLBACK')
+        raise
+    if row is None:
+        return None
+    return row['id'], row['type'], json.loads(row['arguments'])
+
+
+def finish(connection, job_id, error=None):
+    """Markiert einen Job als erledigt bzw. mit Fehlertext als fehlgeschlagen."""
+    connection.execute(
+        'UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?',
+        ('failed' if error else 'done', error, time.time(), job_id)
+    )
+
+
+def requeue_running(connection):
+    """Setzt Jobs, die ein abgestürzter Worker nicht beendet hat, wieder auf "wartend"."""
+    return connection.execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'").rowcount
+
+
+def counts(connection):
+    """Gibt die Anzahl der Jobs pro Status zurück."""
+    rows = connection.execute('SELECT status, COUNT(*) AS count FROM jobs GROUP BY status').fetchall()
+    return {row['status']: row['count'] for row in rows}
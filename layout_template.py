@@ -0,0 +1,121 @@
+import os
+import json
+import threading
+from functools import lru_cache
+from PIL import Image, ImageDraw, ImageOps
+import image_cache
+import render_manifest
+
+########################################       PATH Section      ########################################
+
+# Verzeichnis der mitgelieferten Vorlagen (relativ zum Code, damit es unabhängig vom Arbeitsverzeichnis gefunden wird)
+template_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+# Kantenglättung der abgerundeten Box: die Maske wird in dieser Vergrößerung gezeichnet und dann verkleinert
+box_supersampling = 4
+
+
+##########################################################################################################
+
+########################################       LOAD Section      ########################################
+
+##########################################################################################################
+
+
+def template_path(name):
+    """Gibt den Pfad einer mitgelieferten Vorlage zurück (z. B. "video_quote")."""
+    return os.path.join(template_directory, f'{name}.json')
+
+
+def load_template(path):
+    """Lädt eine Vorlage aus einer JSON- oder YAML-Datei (YAML nur, wenn PyYAML installiert ist)."""
+    with open(path, mode='r', encoding='utf-8') as file:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError as error:
+                raise RuntimeError(f"Für YAML-Vorlagen wird PyYAML benötigt: {path}") from error
+            return yaml.safe_load(file)
+        return json.load(file)
+
+
+##########################################################################################################
+
+########################################       LAYER Section      ########################################
+
+##########################################################################################################
+
+
+@lru_cache(maxsize=32)
+def box_layer(width, height, color, opacity, radius):
+    """Rastert die halbtransparente Box mit abgerundeten Ecken einmal als RGBA-Ebene."""
+    scale = box_supersampling
+    mask = Image.new('L', (width * scale, height * scale), 0)
+    ImageDraw.Draw(mask).rounded_rectangle(
+        (0, 0, width * scale - 1, height * scale - 1), radius=radius * scale, fill=round(255 * opacity)
+    )
+    layer = Image.new('RGBA', (width, height), tuple(color) + (0,))
+    layer.putalpha(mask.resize((width, height), Image.LANCZOS))
+    return layer
+
+
+class CompiledTemplate:
+    """Vorlage mit vorberechneter Geometrie und fertig gerasterten statischen Ebenen.
+
+    background() setzt ein Hintergrundbild einmal mit allen statischen Ebenen (z. B. der Box) zusammen
+    und legt das Ergebnis im Bild-Cache ab; pro Zitat bleibt nur das Rastern des Textes und ein Composite.
+    """
+
+    def __init__(self, template):
+        self.template = template
+        self.digest = render_manifest.inputs_hash(template)[:16]
+        self.size = (template['canvas']['width'], template['canvas']['height'])
+        self.layers = []
+        self.box = None
+
+        box = template.get('box')
+        if box:
+            canvas_width, canvas_height = self.size
+            box_width = int(canvas_width * box['width_ratio'])
+            box_height = int(canvas_height * box['height_ratio'])
+            x = (canvas_width - box_width) // 2
+            y = int(canvas_height * box['center_y_ratio']) - box_height // 2
+            self.box = (x, y, box_width, box_height)
+            layer = box_layer(box_width, box_height, tuple(box['color']), box['opacity'], box.get('radius', 0))
+            self.layers.append((layer, (x, y)))
+
+    def text_area(self):
+        """Gibt (x, y, Breite, Höhe) des Textbereichs zurück: die Box abzüglich Innenabstand, sonst die ganze Fläche."""
+        padding = self.template['text'].get('padding', 0)
+        x, y, width, height = self.box or (0, 0) + self.size
+        return x + padding, y, width - 2 * padding, height - 2 * padding
+
+    def background(self, image_path):
+        """Gibt das Hintergrundbild in Zielgröße mit allen statischen Ebenen als RGB-Bild zurück (nicht verändern)."""
+        key = f'{self.digest}:{image_cache.file_hash(image_path)}'
+        img = image_cache.memory_cache.get(key)
+        if img is None:
+            img = image_cache.load_image(image_path)
+            if img.size != self.size:
+                img = ImageOps.fit(img, self.size, Image.LANCZOS)
+            img = img.convert('RGBA')
+            for layer, position in self.layers:
+                img.alpha_composite(layer, position)
+            img = img.convert('RGB')
+            image_cache.memory_cache.put(key, img)
+        return img
+
+
+# Vorlagen-Hash -> kompilierte Vorlage (Änderungen an der Vorlage erzeugen einen neuen Eintrag)
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+def compile_template(template):
+    """Kompiliert eine Vorlage einmal pro Prozess und Inhalt."""
+    digest = render_manifest.inputs_hash(template)
+    with _compiled_lock:
+        compiled = _compiled.get(digest)
+        if compiled is None:
+            compiled = _compiled[digest] = CompiledTemplate(template)
+    return compiled
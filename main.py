@@ -0,0 +1,154 @@
+import sys
+import time
+import signal
+import logging
+import argparse
+import contextlib
+import importlib
+import traceback
+import job_queue
+import timing
+
+########################################       LOG Section      ########################################
+
+logger = logging.getLogger(__name__)
+
+########################################       JOB Section      ########################################
+
+# Job-Typ -> Modul mit main(argv); die Module (und damit moviepy, openai, boto3) werden erst beim ersten Job geladen
+job_types = {
+    'video': 'make_video',
+    'slideshow': 'make_slideshow',
+    'quotes': 'quote_generator',
+}
+
+
+##########################################################################################################
+
+########################################       RUN Section      ########################################
+
+##########################################################################################################
+
+
+def run_job(job_type, arguments):
+    """Führt einen Job im laufenden Prozess aus; einmal geladene Module und Caches bleiben warm."""
+    module = importlib.import_module(job_types[job_type])
+
+    # Bildindizes abgleichen, damit ein langlebiger Worker neue Hintergrundbilder sieht
+    if 'asset_index' in sys.modules:
+        sys.modules['asset_index'].refresh_indexes()
+
+    start = timing.record_count()
+    try:
+        module.main(list(arguments))
+    except SystemExit as error:
+        # argparse und Skripte beenden sich mit sys.exit; nur ein Code ungleich 0 ist ein Fehler
+        if error.code not in (None, 0):
+            raise RuntimeError(f"{job_type} beendet mit Code {error.code}") from error
+    finally:
+        # Die Messungen stehen bereits im Laufbericht des Jobs und sollen nicht in den nächsten wandern
+        timing.take_records(start)
+
+
+def run_worker(path=job_queue.queue_file, poll_interval=2.0, drain=False):
+    """Arbeitet die Warteschlange ab, bis sie leer ist (drain) oder der Prozess ein SIGTERM/SIGINT bekommt.
+
+    Ein laufender Job wird bei einem Signal noch zu Ende gerendert. Gibt die Anzahl fehlgeschlagener Jobs zurück.
+    """
+    stop = []
+
+    def request_stop(signum, _):
+        logger.info("Signal %d empfangen, beende nach dem aktuellen Job", signum)
+        stop.append(signum)
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    connection = job_queue.connect(path)
+    failed = 0
+    while not stop:
+        job = job_queue.claim(connection)
+        if job is None:
+            if drain:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        job_id, job_type, arguments = job
+        logger.info("Starte Job %d: %s %s", job_id, job_type, ' '.join(arguments))
+        start = time.perf_counter()
+        try:
+            run_job(job_type, arguments)
+        except Exception:
+            failed += 1
+            job_queue.finish(connection, job_id, traceback.format_exc())
+            logger.exception("Job %d fehlgeschlagen", job_id)
+        else:
+            job_queue.finish(connection, job_id)
+            logger.info("Job %d fertig nach %.2f s", job_id, time.perf_counter() - start)
+    connection.close()
+    return failed
+
+
+##########################################################################################################
+
+########################################       MAIN Section      ########################################
+
+##########################################################################################################
+
+
+def main(argv=None):
+    """Gemeinsamer Einstieg: Jobs direkt ausführen, einreihen oder als dauerhafter Worker abarbeiten."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(
+        description='Einstieg für alle Render-Jobs.',
+        epilog='Beispiele: "main.py video --profiles draft", "main.py enqueue slideshow --output video", '
+               '"main.py worker --drain"'
+    )
+    parser.add_argument('--queue', default=job_queue.queue_file, help='Pfad der SQLite-Warteschlange')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    for job_type, module_name in job_types.items():
+        command = commands.add_parser(job_type, help=f'{module_name}.py sofort ausführen', add_help=False)
+        command.add_argument('arguments', nargs=argparse.REMAINDER, help=f'Argumente für {module_name}.py')
+
+    enqueue = commands.add_parser('enqueue', help='Einen Job in die Warteschlange stellen')
+    enqueue.add_argument('type', choices=job_types, help='Job-Typ')
+    enqueue.add_argument('arguments', nargs=argparse.REMAINDER, help='Argumente für das Skript des Job-Typs')
+
+    worker = commands.add_parser('worker', help='Jobs aus der Warteschlange abarbeiten')
+    worker.add_argument('--poll', type=float, default=2.0, help='Wartezeit in Sekunden, wenn keine Jobs anstehen')
+    worker.add_argument('--drain', action='store_true', help='Beenden, sobald die Warteschlange leer ist')
+    worker.add_argument('--requeue-running', action='store_true',
+                        help='Jobs, die ein abgebrochener Worker nicht beendet hat, erneut einreihen')
+
+    commands.add_parser('status', help='Anzahl der Jobs pro Status anzeigen')
+
+    # Optionen wie "--force" gehören dem Skript des Job-Typs und werden unverändert weitergereicht
+    args, extra = parser.parse_known_args(argv)
+    if extra and not hasattr(args, 'arguments'):
+        parser.error(f"unbekannte Argumente: {' '.join(extra)}")
+    if hasattr(args, 'arguments'):
+        args.arguments = extra + args.arguments
+
+    if args.command in job_types:
+        run_job(args.command, args.arguments)
+    elif args.command == 'enqueue':
+        with contextlib.closing(job_queue.connect(args.queue)) as connection:
+            job_id = job_queue.enqueue(connection, args.type, args.arguments)
+        logger.info("Job %d eingereiht: %s %s", job_id, args.type, ' '.join(args.arguments))
+    elif args.command == 'worker':
+        if args.requeue_running:
+            with contextlib.closing(job_queue.connect(args.queue)) as connection:
+                logger.info("%d laufende Jobs erneut eingereiht", job_queue.requeue_running(connection))
+        if run_worker(args.queue, args.poll, args.drain):
+            sys.exit(1)
+    else:
+        with contextlib.closing(job_queue.connect(args.queue)) as connection:
+            for status, count in sorted(job_queue.counts(connection).items()):
+                print(f'{status:<10}{count:>6}')
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,29 @@
 import os
-import csv
-import random
-from datetime import datetime
-from PIL import Image, ImageDraw, ImageFont
+import sys
+import zipfile
+import argparse
+from collections import Counter
 import logging
 from colorama import Fore, Style
-import time
-from PIL import Image, ImageDraw, ImageFont
+import image_cache
+import image_encoder
+import asset_index
+import layout_template
+from database import aws
+import render_manifest
+import csv_ingest
+import render_pool
+import text_layout
+import timing
 
 ########################################       LOG Section      ########################################
 
 # Initialisiere das Logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def log_with_color(message, color=Fore.WHITE, delay=0.5):
-    """Fügt Farben und Verzögerungen zu den Log-Ausgaben hinzu."""
+def log_with_color(message, color=Fore.WHITE):
+    """Fügt Farben zu den Log-Ausgaben hinzu."""
     print(color + message + Style.RESET_ALL)  # Farbiger Text
-    time.sleep(delay)  # Verzögerung
 
 ########################################       PATH Section      ########################################
 
@@ -33,6 +40,31 @@ image_directory = 'image/warrior/'
 font_path = 'arial.ttf'
 font_size = 45
 
+# Vorlage der Slides (Leinwand, Schrift, Textposition, fixer Schlusstext; siehe templates/slideshow.json)
+template_file = os.getenv('SLIDESHOW_TEMPLATE') or layout_template.template_path('slideshow')
+
+# Vorlagen-Parameter der Slides (fließen in den Hash des Render-Manifests ein)
+template_parameters = layout_template.load_template(template_file)
+
+########################################       PIPELINE Section      ########################################
+
+# Format der Einzelbilder: "png", "jpeg", "webp" oder "webp_lossless" (siehe image_encoder.image_formats)
+image_format_name = os.getenv('SLIDESHOW_IMAGE_FORMAT', 'png')
+
+# Ausgabe pro Zeile: "png" (eine Datei pro Slide), "video" (MP4-Slideshow) oder "carousel" (ZIP mit JPEGs)
+output_mode = os.getenv('SLIDESHOW_OUTPUT', 'png')
+output_modes = ('png', 'video', 'carousel')
+
+# Parameter der Video- und Karussell-Ausgabe (fließen nur in diesen Modi in den Manifest-Hash ein)
+pipeline_parameters = {
+    'video_profile': 'tiktok',  # siehe video_encoder.output_profiles
+    'slide_duration': 3.0,  # Standzeit pro Slide in Sekunden
+    'crossfade': 0.5,  # Dauer der Überblendung in Sekunden
+    'carousel_format': 'jpeg',  # siehe image_encoder.image_formats
+    'carousel_quality': 90,
+    'buffer_size': 8,  # Maximale Anzahl vorgerenderter Frames im Speicher
+}
+
 ##########################################################################################################
 
 ########################################       CSV Section      ##########################################
@@ -40,16 +72,16 @@ font_size = 45
 ##########################################################################################################
 
 
-def get_data_from_csv(csv_file):
-    """Liest alle Daten aus der CSV-Datei und gibt sie als Liste von Zeilen zurück."""
-    log_with_color(f"\n Lade Daten aus {csv_file} ...\n", Fore.BLUE, 1.5)
-    with open(csv_file, mode='r', newline='', encoding='utf-8') as file:
-        reader = csv.reader(file, delimiter=';')  # Semikolon als Trennzeichen verwenden
-        # Überspringe die erste Zeile (Header/Spaltennamen)
-        next(reader, None)
-        data = [[entry.replace('\\n', '\n') for entry in row] for row in reader]  # Ersetze \n durch echten Zeilenumbruch
-    log_with_color(f"\nEs wurden {len(data)} Zeilen aus der CSV-Datei geladen.\n", Fore.BLUE, 1.5)
-    return data
+def get_data_from_csv(csv_file, shard=None):
+    """Liest die CSV-Datei zeilenweise und liefert (Index, Zeile), sobald eine Zeile gelesen ist.
+
+    Semikolon als Trennzeichen, die erste Zeile (Spaltennamen) wird übersprungen und "\\n" wird zum
+    Zeilenumbruch. Leere und doppelte Zeilen entfallen; mit shard = (i, n) nur der i-te von n Teilen.
+    """
+    log_with_color(f"\n Lade Daten aus {csv_file} ...\n", Fore.BLUE)
+    stats = Counter()
+    yield from csv_ingest.iter_records(csv_file, delimiter=';', skip_header=True, shard=shard, stats=stats)
+    log_with_color(f"\nZeilen aus der CSV-Datei: {csv_ingest.format_stats(stats)}.\n", Fore.BLUE)
 
 
 ##########################################################################################################
@@ -58,106 +90,190 @@ def get_data_from_csv(csv_file):
 
 ##########################################################################################################
 
-def convert_image_to_png(image_path):
-    """Konvertiert ein Bild von .webp oder anderen Formaten zu .png."""
-    log_with_color(f"\n Konvertierung des Bildes von .webp zu .png ...\n", Fore.RED, 1.0)
-    
-    img = Image.open(image_path)
-    converted_image_path = image_path.replace('.webp', '.png')  # Für WebP-Konvertierung
-    img.save(converted_image_path)
-    
-    log_with_color(f"\n Bild erfolgreich konvertiert und gespeichert unter: {converted_image_path}\n", Fore.RED, 1.0)
+def fit_image_to_canvas(image_path, template=None):
+    """Schneidet ein Bild auf die Slide-Größe zu, skaliert es und gibt den Pfad des PNG-Derivats zurück."""
+    log_with_color(f"\n Skaliere das Bild auf die Slide-Größe ...\n", Fore.RED)
+
+    # Das Derivat landet im Cache-Verzeichnis (Schlüssel = Inhalts-Hash + Größe), die Quelldatei bleibt unverändert
+    canvas = (template or template_parameters)['canvas']
+    canvas_size = (canvas['width'], canvas['height'])
+    with timing.stage('image_convert'):
+        converted_image_path = image_cache.get_canvas_image(image_path, canvas_size)
+
+    log_with_color(f"\n Bild erfolgreich skaliert und gespeichert unter: {converted_image_path}\n", Fore.RED)
     
     return converted_image_path
 
 
-def get_random_image():
-    """Wählt ein zufälliges Bild aus dem Bildverzeichnis aus und gibt den Bildnamen zurück."""
-    log_with_color(f"\n Wähle zufälliges Bild aus dem Verzeichnis {image_directory} ...\n", Fore.MAGENTA, 1.0)
+def pick_random_image():
+    """Wählt ein zufälliges Bild aus dem Bildverzeichnis aus und gibt den Pfad der Quelldatei zurück.
+
+    Die Auswahl kommt aus dem persistenten Bildindex und wiederholt kein Bild, bevor alle einmal dran waren.
+    """
+    log_with_color(f"\n Wähle zufälliges Bild aus dem Verzeichnis {image_directory} ...\n", Fore.MAGENTA)
 
     if not os.path.exists(image_directory):
-        log_with_color(f"\n Bildverzeichnis {image_directory} nicht gefunden.\n", Fore.RED, 1.5)
-        return None, None
+        log_with_color(f"\n Bildverzeichnis {image_directory} nicht gefunden.\n", Fore.RED)
+        return None
 
-    images = [img for img in os.listdir(image_directory) if img.endswith(('png', 'jpg', 'jpeg', 'webp'))]
-    if not images:
-        log_with_color(f"\n Keine Bilder im Verzeichnis {image_directory} gefunden.\n", Fore.RED, 1.5)
-        return None, None
+    with timing.stage('image_pick'):
+        chosen_image = asset_index.get_index(image_directory).pick()
+    if not chosen_image:
+        log_with_color(f"\n Keine Bilder im Verzeichnis {image_directory} gefunden.\n", Fore.RED)
+        return None
 
-    chosen_image = os.path.join(image_directory, random.choice(images))
+    return chosen_image
 
-    # Prüfen, ob das Bild im .webp-Format vorliegt, und konvertieren
-    if chosen_image.endswith('.webp'):
-        chosen_image = convert_image_to_png(chosen_image)  # Konvertierung zu PNG
-    
+
+def prepare_image(chosen_image, template=None):
+    """Bereitet ein ausgewähltes Bild zur Verwendung vor und gibt (Bildpfad, Bildname) zurück."""
     image_name = os.path.splitext(os.path.basename(chosen_image))[0]  # Bildname ohne Erweiterung
-    log_with_color(f"\n Ausgewähltes Bild: {chosen_image}\n", Fore.MAGENTA, 1.0)
+
+    # Zugeschnittenes PNG-Derivat in Slide-Größe verwenden (auch .webp wird dabei konvertiert)
+    chosen_image = fit_image_to_canvas(chosen_image, template)
+    log_with_color(f"\n Ausgewähltes Bild: {chosen_image}\n", Fore.MAGENTA)
 
     return chosen_image, image_name
 
 
-def add_text_to_image(image_path, text, output_path):
-    """Fügt Text zu einem Bild hinzu und speichert es."""
-    log_with_color(f"\n Füge Text hinzu: {text}\n", Fore.YELLOW, 1.0)
+def get_random_image():
+    """Wählt ein zufälliges Bild aus dem Bildverzeichnis aus und gibt den Bildnamen zurück."""
+    chosen_image = pick_random_image()
+    if not chosen_image:
+        return None, None
+    return prepare_image(chosen_image)
+
+
+def render_slide(image_path, text, template=None):
+    """Setzt den Text auf eine Kopie des Bildes und gibt die Slide als PIL-Bild im Speicher zurück."""
+    log_with_color(f"\n Füge Text hinzu: {text}\n", Fore.YELLOW)
+
+    template = template or template_parameters
+    compiled = layout_template.compile_template(template)
     
-    # Öffne das Bild
-    img = Image.open(image_path)
-    draw = ImageDraw.Draw(img)
+    # Hintergrund mit allen statischen Ebenen der Vorlage (einmal pro Bild zusammengesetzt und gecacht)
+    with timing.stage('image_load'):
+        img = compiled.background(image_path).copy()
     
-    # Verwende die Arial Unicode Schriftart
-    font_path = "/Library/Fonts/Arial Unicode.ttf"
-    font = ImageFont.truetype(font_path, 60)  # Verwende die TrueType-Schriftart
+    # Schrift der Vorlage (einmal pro Prozess geladen)
+    text_style = template['text']
+    font_path = text_style['font_path']
+    font_size = text_style['font_size']
 
     # Definiere das Padding und die maximal zulässige Breite für den Text
-    padding = 55  # Randabstand
+    padding = text_style['padding']  # Randabstand
     max_width = img.width - 2 * padding  # Maximale Breite für den Text
-    line_padding = 30  # Abstand zwischen den Zeilen
-
-    def wrap_text(text, font, max_width):
-        lines = []
-        paragraphs = text.split("\n")  # Aufteilen des Textes anhand von Zeilenumbrüchen
-        for paragraph in paragraphs:
-            words = paragraph.split()
-            current_line = ""
-            for word in words:
-                bbox = font.getbbox(current_line + " " + word)
-                line_width = bbox[2] - bbox[0]
-                if line_width <= max_width:
-                    current_line += " " + word
-                else:
-                    lines.append(current_line)
-                    current_line = word
-            lines.append(current_line)
-            lines.append("")  # Leere Zeile hinzufügen, um einen Absatz zu erzeugen
-        return lines
-
-    # Wickle den Text um
-    wrapped_text = wrap_text(text, font, max_width)
-
-    # Berechne die Höhe des Textblocks
-    text_height = sum([font.getbbox(line)[3] - font.getbbox(line)[1] for line in wrapped_text])
+    line_padding = text_style['line_padding']  # Abstand zwischen den Zeilen
+
+    with timing.stage('text_layout'):
+        # Umbruch und umrandeter Text als eigene Ebene (gecacht, z. B. für den fixen Schlusstext)
+        text_layer, layout, margin = text_layout.render_text_layer(
+            text, font_path, font_size, img.width, max_width, line_padding,
+            text_style['fill'], text_style['stroke_fill'], text_style['stroke_width']
+        )
 
     # Berechne die Textposition (mit leicht nach unten verschobenem Startpunkt)
-    y_position = (img.height // 3) - (text_height // 3 - 20)
+    divisor = text_style['y_divisor']
+    y_position = (img.height // divisor) - (layout.text_height // divisor - text_style['y_shift'])
     
-    # Füge die schwarze Umrandung für bessere Lesbarkeit hinzu
-    for line in wrapped_text:
-        text_bbox = font.getbbox(line)
-        text_width = text_bbox[2] - text_bbox[0]
-        line_height = text_bbox[3] - text_bbox[1]
-        x_position = (img.width - text_width) // 2
-        
-        # Zeichne die Umrandung (in Schwarz) um den Text
-        for offset in [(-5, -5), (-5, 5), (5, -5), (5, 5)]:
-            draw.text((x_position + offset[0], y_position + offset[1]), line, font=font, fill='black')
-        
-        # Zeichne den weißen Text
-        draw.text((x_position, y_position), line, font=font, fill='white')
-        y_position += line_height + line_padding  # Vergrößere den Abstand zwischen den Zeilen
+    with timing.stage('composite'):
+        # Die Textebene mit einer einzigen Alpha-Operation auf das Bild setzen
+        img.paste(text_layer, (0, y_position - margin), text_layer)
+
+    return img
+
+
+def add_text_to_image(image_path, text, output_path, template=None, image_format=None):
+    """Fügt Text zu einem Bild hinzu und speichert es (Standard: PNG)."""
+    img = render_slide(image_path, text, template)
 
     # Speichere das Bild mit dem Text
-    img.save(output_path)
-    log_with_color(f"\n Bild mit Text gespeichert unter: {output_path}\n", Fore.GREEN, 1.0)
+    image_encoder.save_image(img, output_path, image_format or image_encoder.get_format(image_format_name))
+    log_with_color(f"\n Bild mit Text gespeichert unter: {output_path}\n", Fore.GREEN)
+
+
+##########################################################################################################
+
+########################################       PIPELINE Section      ##########################################
+
+##########################################################################################################
+
+
+def iter_slides(image_path, texts, png_paths=None, template=None, writer=None, image_format=None):
+    """Erzeugt die Slides einer Zeile nacheinander im Speicher.
+
+    Mit png_paths wird jede Slide zusätzlich als Einzelbild gespeichert; mit einem writer
+    (image_encoder.ImageWriter) läuft das Kodieren im Hintergrund, während die nächste Slide gesetzt wird.
+    """
+    image_format = image_format or image_encoder.get_format(image_format_name)
+    for index, text in enumerate(texts):
+        img = render_slide(image_path, text, template)
+        if png_paths:
+            if writer:
+                writer.save(img, png_paths[index], image_format)
+            else:
+                image_encoder.save_image(img, png_paths[index], image_format)
+        yield img
+
+
+def write_carousel_bundle(slides, output_path, image_format='jpeg', quality=90, writer=None):
+    """Schreibt die Slides komprimiert in ein ZIP-Bündel (slide_01.jpg, ...) für einen Karussell-Post.
+
+    Mit einem writer werden die Slides im Hintergrund kodiert, während die nächste Slide gesetzt wird.
+    """
+    bundle_format = image_encoder.get_format(image_format, quality)
+    temp_path = f'{output_path}.{os.getpid()}.tmp'
+    # Die Bilder sind bereits komprimiert, das ZIP speichert sie daher unverändert
+    with zipfile.ZipFile(temp_path, mode='w', compression=zipfile.ZIP_STORED) as bundle:
+        with timing.stage('encode'):
+            if writer:
+                encoded = [writer.encode(slide, bundle_format) for slide in slides]
+                encoded = [future.result() for future in encoded]
+            else:
+                encoded = [image_encoder.encode_image(slide, bundle_format) for slide in slides]
+        for index, data in enumerate(encoded, start=1):
+            bundle.writestr(f'slide_{index:02d}.{bundle_format.extension}', data)
+    os.replace(temp_path, output_path)
+    return output_path
+
+
+def render_row(image_path, texts, output_path, mode, png_paths=None, template=None, image_format=None):
+    """Rendert alle Slides einer Zeile als Einzelbilder, Video oder Karussell-Bündel.
+
+    Im Modus "png" werden nur die Einzelbilder (png_paths) geschrieben, in den anderen Modi entsteht
+    output_path direkt aus dem Speicher. Kodiert wird in einem Thread-Pool, parallel zum Setzen der
+    nächsten Slide. Gibt die Liste der geschriebenen Dateien zurück.
+    """
+    template = template or template_parameters
+    with image_encoder.ImageWriter() as writer:
+        slides = iter_slides(image_path, texts, png_paths, template, writer, image_format)
+        _write_row(slides, output_path, mode, template, writer)
+    log_with_color(f"\n Zeile gespeichert unter: {output_path or ', '.join(png_paths)}\n", Fore.GREEN)
+    return ([output_path] if output_path else []) + list(png_paths or [])
+
+
+def _write_row(slides, output_path, mode, template, writer):
+    """Schreibt die Slides einer Zeile im gewählten Ausgabemodus."""
+    if mode == 'png':
+        for _ in slides:
+            pass
+    elif mode == 'video':
+        # moviepy wird nur für Videos gebraucht und daher erst hier geladen
+        import video_encoder
+
+        profile = video_encoder.get_profiles(pipeline_parameters['video_profile'])[0]
+        size = layout_template.compile_template(template).size
+        frames = video_encoder.slideshow_frames(
+            slides, profile.fps, pipeline_parameters['slide_duration'], pipeline_parameters['crossfade']
+        )
+        # Stufe "encode" umfasst hier auch das Rendern der Slides, das parallel zum Kodieren läuft
+        with timing.stage('encode'):
+            video_encoder.write_frame_stream(frames, output_path, profile, size, pipeline_parameters['buffer_size'])
+    else:
+        write_carousel_bundle(
+            slides, output_path, pipeline_parameters['carousel_format'], pipeline_parameters['carousel_quality'],
+            writer
+        )
 
 
 ##########################################################################################################
@@ -167,41 +283,133 @@ def add_text_to_image(image_path, text, output_path):
 ##########################################################################################################
 
 
-def create_slideshow(data):
-    """Erstellt eine Fotoslideshow basierend auf den CSV-Daten und fügt am Ende einen fixen Text hinzu."""
-    log_with_color("\n Starte Erstellung der Slideshow...\n", Fore.GREEN, 1.5)
+def create_slideshow(data, workers=None, force=False, uploader=None, mode=None, keep_png=False, image_format=None,
+                     template=None):
+    """Erstellt eine Fotoslideshow basierend auf den CSV-Daten und fügt am Ende einen fixen Text hinzu.
+
+    data liefert (Index, Zeile), z. B. get_data_from_csv; gerendert wird schon während des Lesens.
+    Jede Zeile ist ein Job: im Modus "png" entstehen Einzelbilder im Format image_format (Standard: PNG),
+    in den Modi "video" und "carousel" ein MP4 bzw. ZIP-Bündel direkt aus dem Speicher (Einzelbilder nur
+    zusätzlich mit keep_png). Mit workers > 1 werden die Jobs parallel in einem Prozess-Pool gerendert.
+    Zeilen, deren Eingaben (Texte, Hintergrundbild, Vorlage) sich laut Render-Manifest seit dem letzten
+    Lauf nicht geändert haben, werden übersprungen, außer force ist gesetzt. Mit einem uploader
+    (database.aws.S3BatchUploader) wird jede fertige Datei sofort zum Hochladen eingereiht.
+    template ersetzt die Standardvorlage. Gibt (neu geschriebene Dateien, Fehler) zurück.
+    """
+    log_with_color("\n Starte Erstellung der Slideshow...\n", Fore.GREEN)
+
+    template = template or template_parameters
+
+    image_format = image_format or image_encoder.get_format(image_format_name)
+
+    mode = mode or output_mode
+    if mode not in output_modes:
+        raise ValueError(f"Unbekannter Ausgabemodus: {mode} (verfügbar: {', '.join(output_modes)})")
+    # Die Pipeline-Parameter gehören nur in den Streaming-Modi zu den Eingaben
+    mode_inputs = () if mode == 'png' else (mode, pipeline_parameters, keep_png)
+    # Das Bildformat nur dort, wo Einzelbilder geschrieben werden
+    if mode == 'png' or keep_png:
+        mode_inputs += (image_format,)
 
     if not os.path.exists(output_directory):
         os.makedirs(output_directory)
 
-    # Für jede Zeile in der CSV
-    for idx, row in enumerate(data):
-        log_with_color(f"\n Erstelle Slideshow für Zeile {idx + 1}...\n", Fore.YELLOW, 1.5)
+    manifest_path = render_manifest.manifest_path('slideshow')
+    manifest = render_manifest.load_manifest(manifest_path)
+    pending = {}
+    hits = 0
+
+    def iter_jobs():
+        nonlocal hits
+        # Für jede Zeile in der CSV
+        for idx, row in data:
+            # Deterministischer Schlüssel aus dem Zeileninhalt, damit parallele Worker nie kollidieren
+            row_key = render_pool.job_key(*row)
+            entry = manifest.get(row_key)
+
+            # Bereits gerenderte Zeilen behalten ihr Hintergrundbild, neue Zeilen bekommen ein zufälliges
+            source_image = None if force else render_manifest.previous_source(entry)
+            if source_image is None:
+                source_image = pick_random_image()
+            if not source_image:
+                log_with_color(f"\n Fehler: Kein Bild für Zeile {idx + 1} gefunden. Überspringe...\n", Fore.RED)
+                continue
+
+            digest = render_manifest.inputs_hash(
+                row, image_cache.file_hash(source_image), template, *mode_inputs
+            )
+            if not force and render_manifest.is_up_to_date(entry, digest):
+                hits += 1
+                log_with_color(f"\n Zeile {idx + 1} ist unverändert, vorhandene Slides werden verwendet.\n", Fore.CYAN)
+                continue
+
+            log_with_color(f"\n Erstelle Slideshow für Zeile {idx + 1}...\n", Fore.YELLOW)
         
-        # Zufälliges Bild auswählen und Bildnamen erhalten
-        image_path, image_name = get_random_image()
-        if not image_path:
-            log_with_color(f"\n Fehler: Kein Bild für Zeile {idx + 1} gefunden. Überspringe...\n", Fore.RED, 1.5)
-            continue
+            # Bild vorbereiten und Bildnamen erhalten
+            image_path, image_name = prepare_image(source_image, template)
+            slide_path = f'{output_directory}/slideshow_{row_key}_{image_name}_{idx+1}'
+            texts = []
+            png_paths = []
         
-        # Für jede Spalte (Text) in der Zeile
-        for col_idx, text in enumerate(row):
-            # Prüfen, ob der Text leer ist, und nur dann fortfahren, wenn er Inhalt hat
-            if text.strip():
-                # Erstelle einen Dateinamen für das Bild unter Berücksichtigung des Bildnamens
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                output_path = f'{output_directory}/slideshow_{timestamp}_{image_name}_{idx+1}_{col_idx+1}.png'
-                
-                # Füge den Text dem Bild hinzu und speichere es
-                add_text_to_image(image_path, text, output_path)
+            # Für jede Spalte (Text) in der Zeile
+            for col_idx, text in enumerate(row):
+                # Prüfen, ob der Text leer ist, und nur dann fortfahren, wenn er Inhalt hat
+                if text.strip():
+                    # Erstelle einen Dateinamen für das Bild unter Berücksichtigung des Bildnamens
+                    texts.append(text)
+                    png_paths.append(f'{slide_path}_{col_idx+1}.{image_format.extension}')
         
-        # Füge am Ende einen fixen Eintrag hinzu (z.B. "Für mehr Content...")
-        log_with_color(f"\n Füge fixen Eintrag für Slideshow {idx + 1} hinzu...\n", Fore.YELLOW, 1.5)
-        fixed_text = "Folge für mehr Content \n --> \n easyy_mindset :)"
-        fixed_output_path = f'{output_directory}/slideshow_{timestamp}_{image_name}_{idx+1}_final.png'
-        add_text_to_image(image_path, fixed_text, fixed_output_path)
-
-    log_with_color("\n Slideshow-Erstellung abgeschlossen.\n", Fore.GREEN, 1.5)
+            # Füge am Ende einen fixen Eintrag hinzu (z.B. "Für mehr Content...")
+            texts.append(template['fixed_text'])
+            png_paths.append(f'{slide_path}_final.{image_format.extension}')
+
+            if mode == 'png':
+                # Die Slides einer Zeile in einem Job, damit das Kodieren mit dem Setzen der nächsten Slide überlappt
+                job = (png_paths[0], (image_path, texts, None, mode, png_paths, template, image_format))
+                outputs = png_paths
+            else:
+                # Die ganze Zeile wird als ein Job direkt in ein Video bzw. Bündel gestreamt
+                extension = 'mp4' if mode == 'video' else 'zip'
+                row_output_path = f'{slide_path}.{extension}'
+                kept_paths = png_paths if keep_png else None
+                job = (
+                    row_output_path,
+                    (image_path, texts, row_output_path, mode, kept_paths, template, image_format)
+                )
+                outputs = [row_output_path] + (png_paths if keep_png else [])
+
+            pending[row_key] = {'inputs': digest, 'source': source_image, 'outputs': outputs}
+            yield job
+
+    def upload_row(_, written):
+        for output_path in written:
+            uploader.submit(output_path)
+
+    # Füge den Text den Bildern hinzu und speichere sie
+    results, failures = render_pool.run_jobs(render_row, iter_jobs(), workers, upload_row if uploader else None)
+
+    # Nur vollständig gerenderte Zeilen ins Manifest übernehmen
+    failed_outputs = {output_path for output_path, _ in failures}
+    for row_key, entry in pending.items():
+        if not failed_outputs.intersection(entry['outputs']):
+            manifest[row_key] = entry
+    render_manifest.save_manifest(manifest_path, manifest)
+
+    # Rotationsstand speichern, damit der nächste Lauf die Bildauswahl ohne Wiederholung fortsetzt
+    if os.path.exists(image_directory):
+        asset_index.get_index(image_directory).save()
+
+    for output_path, error in failures:
+        log_with_color(f"\n Fehler bei {output_path}:\n{error}\n", Fore.RED)
+    if not (results or failures or hits):
+        log_with_color("\n Keine Daten in der CSV gefunden.\n", Fore.RED)
+    log_with_color(
+        f"\n Slideshow-Erstellung abgeschlossen: {len(results)}/{len(results) + len(failures)} Zeilen erstellt, "
+        f"Manifest: {hits} Zeilen unverändert übernommen, {len(pending)} Zeilen neu gerendert.\n",
+        Fore.GREEN
+    )
+    written = [path for paths in results.values() for path in paths]
+    return written, failures
 
 
 ##########################################################################################################
@@ -210,19 +418,62 @@ def create_slideshow(data):
 
 ##########################################################################################################
 
-def main():
+def main(argv=None):
     """Hauptfunktion des Programms."""
-    
-    log_with_color("\n Starte den Hauptprozess...\n", Fore.GREEN, 1.5)
 
-    # Lade Daten aus der CSV und erstelle Slideshow-Bilder
-    data = get_data_from_csv(csv_file)
-    if data:
-        create_slideshow(data)
-    else:
-        log_with_color("\n Keine Daten in der CSV gefunden.\n", Fore.RED, 1.5)
+    log_with_color("\n Starte den Hauptprozess...\n", Fore.GREEN)
+
+    parser = argparse.ArgumentParser(description='Erstellt Slideshow-Bilder aus der CSV-Datei.')
+    render_pool.add_worker_argument(parser)
+    timing.add_report_argument(parser)
+    render_manifest.add_force_argument(parser)
+    render_manifest.add_output_list_argument(parser)
+    aws.add_upload_arguments(parser)
+    parser.add_argument(
+        '--output', choices=output_modes, default=output_mode,
+        help='png: eine Datei pro Slide, video: MP4-Slideshow pro Zeile, carousel: ZIP-Bündel pro Zeile'
+    )
+    parser.add_argument(
+        '--keep-png', action='store_true', help='In den Modi video/carousel zusätzlich Einzelbilder schreiben'
+    )
+    image_encoder.add_format_arguments(parser, image_format_name)
+    parser.add_argument('--template', default=None, help='Alternative Vorlage (JSON oder YAML)')
+    text_layout.add_font_argument(parser)
+    csv_ingest.add_shard_argument(parser)
+    args = parser.parse_args(argv)
+    # Die Vorlage gilt nur für diesen Aufruf (ein Worker führt viele Jobs im selben Prozess aus)
+    template = layout_template.load_template(args.template) if args.template else template_parameters
+    template = text_layout.with_font(template, args.font)
+
+    # Fertige Dateien schon während des Renderns im Hintergrund hochladen
+    uploader = None
+    if args.upload_bucket:
+        uploader = aws.S3BatchUploader(args.upload_bucket, prefix=args.upload_prefix, workers=args.upload_workers)
+
+    # Lade Daten aus der CSV und erstelle Slideshow-Bilder (das Rendern beginnt mit der ersten gelesenen Zeile)
+    data = get_data_from_csv(csv_file, args.shard)
+    written, failures = create_slideshow(
+        data, args.workers, args.force, uploader, args.output, args.keep_png, image_encoder.format_from_args(args),
+        template
+    )
+    if args.output_list:
+        render_manifest.write_output_list(args.output_list, written)
+
+    upload_failures = []
+    if uploader:
+        upload_results = uploader.close()
+        upload_failures = aws.failed_uploads(upload_results)
+        log_with_color(f"\n{aws.format_upload_report(upload_results)}\n", Fore.CYAN)
+
+    # Zeige, wo die Renderzeit tatsächlich hingeht, und speichere den Laufbericht
+    report_path = timing.write_report(args.report or timing.default_report_path('slideshow'))
+    log_with_color(f"\n{timing.format_summary()}\n\n Laufbericht gespeichert unter: {report_path}\n", Fore.CYAN)
     
-    log_with_color("\n Hauptprozess abgeschlossen.\n", Fore.GREEN, 1.5)
+    log_with_color("\n Hauptprozess abgeschlossen.\n", Fore.GREEN)
+
+    # Fehlgeschlagene Zeilen und Uploads als Fehler melden (CI-Lauf bzw. Job in der Warteschlange schlägt fehl)
+    if failures or upload_failures:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
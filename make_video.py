@@ -1,32 +1,42 @@
 import os
-import csv
-import time
-import random
-from datetime import datetime
+import sys
+import asyncio
+import argparse
+from collections import Counter
 from dotenv import load_dotenv
-import openai
-from moviepy.editor import TextClip, CompositeVideoClip, AudioFileClip, ImageClip, ColorClip
+import numpy as np
+from moviepy.editor import CompositeVideoClip, ImageClip
 import logging
 from colorama import Fore, Style, init
-from PIL import Image
+import image_cache
+import asset_index
+import audio_cache
+import caption_animation
+import layout_template
+import text_layout
+from database import aws
+import quote_generator
+import render_manifest
+import csv_ingest
+import render_pool
+import timing
+import video_encoder
 
 ########################################       LOG Section      ########################################
 
 # Initialisiere das Logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def log_with_color(message, color=Fore.WHITE, delay=0.5):
-    """Fügt Farben und Verzögerungen zu den Log-Ausgaben hinzu."""
+def log_with_color(message, color=Fore.WHITE):
+    """Fügt Farben zu den Log-Ausgaben hinzu."""
     print(color + message + Style.RESET_ALL)  # Farbiger Text
-    time.sleep(delay)  # Verzögerung
 
 ########################################       OPENAI Section      ########################################
 
 # Lade die Umgebungsvariablen aus der .env-Datei
 load_dotenv()
 
-# Setze deine OpenAI API-Schlüssel hier
-openai.api_key = os.getenv('OPENAI_API_KEY')
+# Der OpenAI-Client (quote_generator) liest OPENAI_API_KEY selbst und wird erst bei Bedarf importiert
 
 ########################################       PATH Section      ########################################
 
@@ -39,9 +49,32 @@ video_directory = 'videos/output/'
 # Verzeichnis, in dem die Bilder gespeichert sind
 image_directory = 'image/'
 
+# Optionale Kategorie (Unterordner von image_directory, z. B. "warrior"); ohne Angabe alle Bilder
+image_category = os.getenv('VIDEO_IMAGE_CATEGORY') or None
+
 # Verzeichnis, in dem die Audiodatei gespeichert ist
 audio_file_path = 'audio/idea10.mp3'  # Beispielpfad zur Audiodatei
 
+# Optionales Verzeichnis mit mehreren Soundtracks, die reihum auf die Videos verteilt werden
+audio_track_directory = os.getenv('VIDEO_AUDIO_DIR')
+
+########################################       RENDER Section      ########################################
+
+# Statische Kompositionen (Bild + Box + Text) einmal flach rechnen und als Standbild-Video kodieren
+use_still_frame_fast_path = os.getenv('VIDEO_STILL_FRAME', '1') != '0'
+
+# Ausgabeprofile (siehe video_encoder.output_profiles), z. B. "tiktok,instagram_reel" oder "draft"
+output_profile_names = os.getenv('VIDEO_PROFILES', 'tiktok').split(',')
+
+# Vorlage der Videos (Leinwand, Dauer, Box, Text, Animation; siehe templates/video_quote.json)
+template_file = os.getenv('VIDEO_TEMPLATE') or layout_template.template_path('video_quote')
+
+# Vorlagen-Parameter der Videos (fließen in den Hash des Render-Manifests ein)
+template_parameters = layout_template.load_template(template_file)
+
+# Animierte Bildunterschrift statt der statischen: "fade", "words" oder "typewriter" (leer = aus)
+caption_effect = os.getenv('VIDEO_CAPTION_EFFECT') or None
+
 
 ##########################################################################################################
 
@@ -51,33 +84,33 @@ audio_file_path = 'audio/idea10.mp3'  # Beispielpfad zur Audiodatei
 
 
 def generate_quote():
-    """Generiert ein inspirierendes Zitat mit der OpenAI API."""
-    log_with_color("\n Generiere Zitat mit OpenAI API...\n", Fore.CYAN, 1.5)
-    response = openai.Completion.create(
-        engine="text-davinci-003",
-        prompt="Generate an inspirational quote",
-        max_tokens=50
+    """Generiert ein inspirierendes Zitat mit der OpenAI API (für mehrere Zitate: quote_generator)."""
+    log_with_color("\n Generiere Zitat mit OpenAI API...\n", Fore.CYAN)
+    quotes, failures = asyncio.run(
+        quote_generator.generate_quotes_async([quote_generator.default_prompt], quote_generator.openai_backend())
     )
-    quote = response.choices[0].text.strip()
-    log_with_color(f"\n Generiertes Zitat: {quote}\n", Fore.GREEN, 1.5)
+    if failures:
+        raise failures[0][1]
+    quote = quotes[0]
+    log_with_color(f"\n Generiertes Zitat: {quote}\n", Fore.GREEN)
     return quote
 
 def save_quote_to_csv(quote, csv_file):
     """Speichert das Zitat in einer CSV-Datei."""
-    log_with_color(f"\n Speichere Zitat in {csv_file} ...\n", Fore.YELLOW, 1.5)
-    with open(csv_file, mode='a', newline='', encoding='utf-8') as file:
-        writer = csv.writer(file)
-        writer.writerow([quote])
-    log_with_color(f"Zitat erfolgreich in {csv_file} gespeichert.", Fore.MAGENTA, 1.5)
-
-def get_quotes_from_csv(csv_file):
-    """Liest alle Zitate aus der CSV-Datei und gibt sie als Liste zurück."""
-    log_with_color(f"\n [1/7] Lade Zitate aus {csv_file} ...\n", Fore.BLUE, 1.5)
-    with open(csv_file, mode='r', newline='', encoding='utf-8') as file:
-        reader = csv.reader(file)
-        quotes = [row[0] for row in reader]
-    log_with_color(f"\nEs wurden {len(quotes)} Zitate aus der CSV-Datei geladen.\n", Fore.BLUE, 1.5)
-    return quotes
+    log_with_color(f"\n Speichere Zitat in {csv_file} ...\n", Fore.YELLOW)
+    quote_generator.save_quotes_to_csv([quote], csv_file)
+    log_with_color(f"Zitat erfolgreich in {csv_file} gespeichert.", Fore.MAGENTA)
+
+def get_quotes_from_csv(csv_file, shard=None):
+    """Liest die Zitate zeilenweise aus der CSV-Datei und liefert (Index, Zitat), sobald sie gelesen sind.
+
+    Leere Zeilen und doppelte Zitate werden übersprungen; mit shard = (i, n) nur der i-te von n Teilen.
+    """
+    log_with_color(f"\n [1/7] Lade Zitate aus {csv_file} ...\n", Fore.BLUE)
+    stats = Counter()
+    for index, cells in csv_ingest.iter_records(csv_file, shard=shard, stats=stats):
+        yield index, cells[0]
+    log_with_color(f"\nZitate aus der CSV-Datei: {csv_ingest.format_stats(stats)}.\n", Fore.BLUE)
 
 
 ##########################################################################################################
@@ -87,44 +120,61 @@ def get_quotes_from_csv(csv_file):
 ##########################################################################################################
 
 
-def convert_image_to_png(image_path):
-    """Konvertiert ein Bild von .webp oder anderen Formaten zu .png."""
-    log_with_color(f"\n [3/7] Konvertierung des Bildes von .webp zu .png ...\n", Fore.RED, 1.0)
-    
-    img = Image.open(image_path)
-    converted_image_path = image_path.replace('.webp', '.png')  # Für WebP-Konvertierung
-    img.save(converted_image_path)
-    
-    log_with_color(f"\n Bild erfolgreich konvertiert und gespeichert unter: {converted_image_path}\n", Fore.RED, 1.0)
-    
+def fit_image_to_canvas(image_path, template=None):
+    """Schneidet ein Bild auf die Videogröße zu, skaliert es und gibt den Pfad des PNG-Derivats zurück."""
+    log_with_color(f"\n [3/7] Skaliere das Bild auf die Videogröße ...\n", Fore.RED)
+
+    # Das Derivat landet im Cache-Verzeichnis (Schlüssel = Inhalts-Hash + Größe), die Quelldatei bleibt unverändert
+    canvas = (template or template_parameters)['canvas']
+    canvas_size = (canvas['width'], canvas['height'])
+    with timing.stage('image_convert'):
+        converted_image_path = image_cache.get_canvas_image(image_path, canvas_size)
+
+    log_with_color(f"\n Bild erfolgreich skaliert und gespeichert unter: {converted_image_path}\n", Fore.RED)
+
     return converted_image_path
 
-def get_random_background_image():
-    """Wählt ein zufälliges Bild aus dem Hintergrundverzeichnis aus und konvertiert .webp falls nötig."""
-    log_with_color(f"\n [2/7] Wähle zufälliges Hintergrundbild aus dem Verzeichnis {image_directory} ...\n", Fore.MAGENTA, 1.0)
+def pick_random_background_image():
+    """Wählt ein zufälliges Bild aus dem Hintergrundverzeichnis aus und gibt den Pfad der Quelldatei zurück.
+
+    Die Auswahl kommt aus dem persistenten Bildindex (inkl. Unterordnern) und wiederholt kein Bild,
+    bevor nicht alle Bilder der Kategorie einmal verwendet wurden.
+    """
+    log_with_color(f"\n [2/7] Wähle zufälliges Hintergrundbild aus dem Verzeichnis {image_directory} ...\n", Fore.MAGENTA)
     
     if not os.path.exists(image_directory):
-        log_with_color(f"\n Hintergrundverzeichnis {image_directory} nicht gefunden.\n", Fore.RED, 1.5)
-        return None, None
+        log_with_color(f"\n Hintergrundverzeichnis {image_directory} nicht gefunden.\n", Fore.RED)
+        return None
 
-    images = [img for img in os.listdir(image_directory) if img.endswith(('png', 'jpg', 'jpeg', 'webp'))]
-    if not images:
-        log_with_color(f"\n Keine Hintergrundbilder im Verzeichnis {image_directory} gefunden.\n", Fore.RED, 1.5)
-        return None, None
+    with timing.stage('image_pick'):
+        chosen_image = asset_index.get_index(image_directory).pick(image_category)
+    if not chosen_image:
+        log_with_color(f"\n Keine Hintergrundbilder im Verzeichnis {image_directory} gefunden.\n", Fore.RED)
+        return None
+
+    log_with_color(f"\n Ausgewähltes Bild: {chosen_image}\n", Fore.MAGENTA)
+    return chosen_image
 
-    chosen_image = os.path.join(image_directory, random.choice(images))
-    log_with_color(f"\n Ausgewähltes Bild: {chosen_image}\n", Fore.MAGENTA, 1.0)
 
+def prepare_background_image(chosen_image, template=None):
+    """Bereitet ein ausgewähltes Hintergrundbild vor (zugeschnitten auf die Videogröße) und gibt (Bildpfad, Bildname) zurück."""
     # Extrahiere den Bildnamen ohne Pfad und Erweiterung
     image_name = os.path.splitext(os.path.basename(chosen_image))[0]
 
-    # Konvertiere zu PNG, falls nötig
-    if chosen_image.endswith('.webp'):
-        chosen_image = convert_image_to_png(chosen_image)
+    # Zugeschnittenes PNG-Derivat in Videogröße verwenden (auch .webp wird dabei konvertiert)
+    chosen_image = fit_image_to_canvas(chosen_image, template)
 
     return chosen_image, image_name
 
 
+def get_random_background_image():
+    """Wählt ein zufälliges Bild aus dem Hintergrundverzeichnis aus und konvertiert .webp falls nötig."""
+    chosen_image = pick_random_background_image()
+    if not chosen_image:
+        return None, None
+    return prepare_background_image(chosen_image)
+
+
 ##########################################################################################################
 
 ########################################       VIDEO Section      ########################################
@@ -132,70 +182,98 @@ def get_random_background_image():
 ##########################################################################################################
 
 
-def create_video_with_quote(quote, output_path, image_path, image_name):
-    """Erstellt ein Video mit dem angegebenen Zitat und einer Audiodatei."""
-    log_with_color(f"\n [4/7] Erstelle Video für Zitat: {quote}\n", Fore.YELLOW, 1.5)
+def create_video_with_quote(quote, output_path, image_path, image_name, profile_names=None, audio_track=None,
+                            effect=None, template=None):
+    """Erstellt ein Video mit dem angegebenen Zitat und einer Audiodatei.
+
+    Die Komposition wird einmal gerendert und parallel in alle Ausgabeprofile kodiert
+    (z. B. "tiktok,instagram_reel" oder "draft" für eine schnelle Vorschau).
+    audio_track ersetzt die Standard-Audiodatei. Mit effect ("fade", "words", "typewriter") wird der Text
+    animiert über den einmal flach gerechneten Hintergrund gelegt und als Frame-Strom kodiert.
+    template ersetzt die Standardvorlage. Gibt die Liste der geschriebenen Dateien zurück.
+    """
+    log_with_color(f"\n [4/7] Erstelle Video für Zitat: {quote}\n", Fore.YELLOW)
 
     # Verwende das übergebene Hintergrundbild und den Bildnamen
     if image_path is None:
-        log_with_color("\nKein Hintergrundbild gefunden. Video kann nicht erstellt werden.\n", Fore.RED, 1.5)
-        return
-
-    # Erstelle den ImageClip
-    image_clip = ImageClip(image_path).set_duration(10)
-
-
-########################################       BOX Section      ########################################
-
-    # Füge eine halbtransparente weiße Box mit abgerundeten Ecken hinzu
-    box_height = int(1920 * 0.33)  
-    box_width = int(1080 * 0.66)
-
-    # Erstelle den BoxClip
-    box_clip = ColorClip(size=(box_width, box_height), color=(255, 255, 255)).set_duration(10).set_opacity(0.65)
-
-    # Berechne die neue Y-Position, um die Box auf 2/3 der Höhe zu platzieren
-    y_position = int(1920 * (2/5)) - (box_height // 2)  # 2/3 der Höhe minus die Hälfte der Box-Höhe
-
-    # Setze die Box auf 2/3 der Höhe
-    box_clip = box_clip.set_position(('center', y_position))
+        log_with_color("\nKein Hintergrundbild gefunden. Video kann nicht erstellt werden.\n", Fore.RED)
+        return []
+
+    profiles = video_encoder.get_profiles(profile_names or output_profile_names)
+    outputs = [
+        (profile, video_encoder.variant_path(output_path, profile, len(profiles) == 1)) for profile in profiles
+    ]
+
+    # Die Vorlage wird einmal pro Prozess kompiliert (Geometrie und gerasterte Box)
+    template = template or template_parameters
+    compiled = layout_template.compile_template(template)
+    text = template['text']
+    duration = template['duration']
+    fps = template['fps']
+
+    # Stufe "compose": Hintergrund mit der vorgerenderten Box (gecacht pro Bild und Vorlage) und Text
+    with timing.stage('compose'):
+        # Bild und halbtransparente Box mit abgerundeten Ecken in einem Schritt
+        background = compiled.background(image_path)
+        text_area = compiled.text_area()
 
 ########################################       TEXT Section      ########################################
 
-    # Erstelle den TextClip und füge Padding hinzu, indem die Größe des Textclips etwas verkleinert wird
-    text_padding = 25
-    text_clip = TextClip(
-        quote, 
-        fontsize=45, 
-        color='black', 
-        font='Arial-Bold',
-        size=(box_width - text_padding * 2, box_height - text_padding * 2),
-        method='caption'
-    )
-    text_clip = text_clip.set_duration(10).set_position(('center', y_position))
-
-    # Kombiniere den Hintergrund, die Box und den Text
-    video = CompositeVideoClip([image_clip, box_clip, text_clip])
-
-    log_with_color(f"\n Video erstellt für Zitat: {quote}\n", Fore.YELLOW, 1.5)
+        if not effect:
+            # Bildunterschrift in der Größe des Textbereichs (Box abzüglich Innenabstand) in-process rastern;
+            # passt der Text nicht, wird die Schrift verkleinert
+            caption = text_layout.render_caption(
+                quote, text['font_path'], text['font_size'], tuple(text_area[2:]), tuple(text['color']),
+                text['line_padding'], text['min_font_size']
+            )
+            text_clip = ImageClip(caption).set_duration(duration).set_position(text_area[:2])
+
+            # Kombiniere den Hintergrund (mit Box) und den Text
+            image_clip = ImageClip(np.asarray(background)).set_duration(duration)
+            video = CompositeVideoClip([image_clip, text_clip])
+
+    if effect:
+        with timing.stage('text_layout'):
+            # Jede Zeile wird einmal als Maske gerastert; Wörter und Zeichen sind Ausschnitte davon
+            animation = template['animation']
+            pieces = caption_animation.build_pieces(
+                quote, text['font_path'], text['font_size'], text_area, effect,
+                start=animation['start'], word_interval=animation['word_interval'],
+                chars_per_second=animation['chars_per_second'], fade=animation['fade'],
+                line_padding=text['line_padding'], min_font_size=text['min_font_size']
+            )
+        frames = caption_animation.caption_frames(np.asarray(background), pieces, tuple(text['color']), fps, duration)
+
+    log_with_color(f"\n Video erstellt für Zitat: {quote}\n", Fore.YELLOW)
 
 ########################################       AUDIO Section      ########################################
 
-    # Lade die Audiodatei
-    if os.path.exists(audio_file_path):
-        log_with_color(f"\n [5/7] Lade Audiodatei {audio_file_path} ...\n", Fore.CYAN, 1.0)
-        audio_clip = AudioFileClip(audio_file_path).set_duration(video.duration)
-        # Füge die Audiodatei zum Video hinzu
-        video = video.set_audio(audio_clip)
-        log_with_color(f"\n Audiodatei {audio_file_path} erfolgreich hinzugefügt.\n", Fore.CYAN, 1.5)
+    # Lade die Audiodatei (zugeschnitten und kodiert kommt sie aus dem Audio-Cache)
+    audio_track = audio_track or audio_file_path
+    audio_path = None
+    if os.path.exists(audio_track):
+        log_with_color(f"\n [5/7] Lade Audiodatei {audio_track} ...\n", Fore.CYAN)
+        audio_path = audio_track
     else:
-        log_with_color(f"\n Audiodatei {audio_file_path} nicht gefunden.\n", Fore.RED, 1.5)
+        log_with_color(f"\n Audiodatei {audio_track} nicht gefunden.\n", Fore.RED)
 
-    log_with_color(f"\n [6/7] Speichere Video zu {output_path} ...\n", Fore.GREEN, 1.5)
-    
-    video.write_videofile(output_path, fps=24)
+    log_with_color(f"\n [6/7] Speichere Video zu {output_path} ...\n", Fore.GREEN)
+
+    if effect:
+        # Die Frames werden erst beim Kodieren erzeugt und über einen begrenzten Puffer an ffmpeg gestreamt
+        written = video_encoder.write_stream_variants(
+            frames, compiled.size, fps, duration, outputs, audio_path=audio_path,
+            audio_offset=template['audio_offset'], buffer_size=template['animation']['buffer_size']
+        )
+    else:
+        # Einmal rendern, dann parallel in alle Profile kodieren (statische Videos über den Standbild-Pfad)
+        written = video_encoder.write_variants(
+            video, outputs, fps, audio_path=audio_path, use_still_frame=use_still_frame_fast_path,
+            audio_offset=template['audio_offset']
+        )
     
-    log_with_color(f"\n Video erfolgreich erstellt: {output_path}\n", Fore.GREEN, 1.5)
+    log_with_color(f"\n Video erfolgreich erstellt: {', '.join(written)}\n", Fore.GREEN)
+    return written
 
 
 ##########################################################################################################
@@ -205,26 +283,138 @@ def create_video_with_quote(quote, output_path, image_path, image_name):
 ##########################################################################################################    
 
 
-def main():
+def main(argv=None):
     """Hauptfunktion des Programms."""
-    
-    log_with_color("\n [0/7]] Starte den Hauptprozess...\n", Fore.GREEN, 1.5)
-
-    # Lade Zitate aus der CSV und erstelle Videos
-    quotes = get_quotes_from_csv(csv_file)
-    if quotes:
-        for idx, quote in enumerate(quotes):
-            # Hintergrundbild zufällig auswählen
-            image_path, image_name = get_random_background_image()
+
+    log_with_color("\n [0/7]] Starte den Hauptprozess...\n", Fore.GREEN)
+
+    parser = argparse.ArgumentParser(description='Erstellt Zitat-Videos aus der CSV-Datei.')
+    render_pool.add_worker_argument(parser)
+    timing.add_report_argument(parser)
+    render_manifest.add_force_argument(parser)
+    render_manifest.add_output_list_argument(parser)
+    aws.add_upload_arguments(parser)
+    parser.add_argument(
+        '--profiles', default=','.join(output_profile_names),
+        help=f"Kommagetrennte Ausgabeprofile ({', '.join(video_encoder.output_profiles)})"
+    )
+    parser.add_argument(
+        '--audio-dir', default=audio_track_directory,
+        help='Verzeichnis mit Soundtracks, die reihum verwendet werden (statt der einzelnen Audiodatei)'
+    )
+    parser.add_argument(
+        '--caption-effect', choices=caption_animation.effects, default=caption_effect,
+        help='Text animiert einblenden (fade, words, typewriter) statt als statische Bildunterschrift'
+    )
+    parser.add_argument('--template', default=None, help='Alternative Vorlage (JSON oder YAML)')
+    text_layout.add_font_argument(parser)
+    csv_ingest.add_shard_argument(parser)
+    args = parser.parse_args(argv)
+    # Die Vorlage gilt nur für diesen Aufruf (ein Worker führt viele Jobs im selben Prozess aus)
+    template = layout_template.load_template(args.template) if args.template else template_parameters
+    template = text_layout.with_font(template, args.font)
+    profiles = video_encoder.get_profiles(args.profiles)
+    profile_names = [profile.name for profile in profiles]
+
+    # Fertige Dateien schon während des Renderns im Hintergrund hochladen
+    uploader = None
+    if args.upload_bucket:
+        uploader = aws.S3BatchUploader(args.upload_bucket, prefix=args.upload_prefix, workers=args.upload_workers)
+
+    # Zitate werden zeilenweise gelesen; das erste Video rendert, während der Rest der CSV noch ungelesen ist
+    os.makedirs(video_directory, exist_ok=True)
+    manifest_path = render_manifest.manifest_path('video')
+    manifest = render_manifest.load_manifest(manifest_path)
+    audio_tracks = audio_cache.list_tracks(args.audio_dir)
+    pending = {}
+    hits = 0
+
+    def iter_jobs():
+        nonlocal hits
+        for idx, quote in get_quotes_from_csv(csv_file, args.shard):
+            # Deterministischer Schlüssel aus dem Zitat, damit parallele Worker nie kollidieren
+            quote_key = render_pool.job_key(quote)
+            entry = manifest.get(quote_key)
+
+            # Bereits gerenderte Zitate behalten ihr Hintergrundbild, neue Zitate bekommen ein zufälliges
+            source_image = None if args.force else render_manifest.previous_source(entry)
+            if source_image is None:
+                # Hintergrundbild zufällig auswählen
+                source_image = pick_random_background_image()
+            if not source_image:
+                continue
+
+            # Soundtracks reihum verteilen; dekodiert wird jeder Track nur einmal (Audio-Cache)
+            audio_track = audio_cache.pick_track(audio_tracks, idx) or audio_file_path
+            audio_hash = image_cache.file_hash(audio_track) if os.path.exists(audio_track) else None
+
+            digest = render_manifest.inputs_hash(
+                quote, image_cache.file_hash(source_image), template, audio_hash, profiles,
+                *((args.caption_effect,) if args.caption_effect else ())
+            )
+            if not args.force and render_manifest.is_up_to_date(entry, digest):
+                hits += 1
+                log_with_color(f"\n Zitat {idx + 1} ist unverändert, vorhandenes Video wird verwendet.\n", Fore.CYAN)
+                continue
+
+            image_path, image_name = prepare_background_image(source_image, template)
             if image_path and image_name:
-                # Erstelle einen Zeitstempel für den Videonamen
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                output_path = f'{video_directory}/video_{timestamp}_{image_name}_{idx + 1}.mp4'
-                create_video_with_quote(quote, output_path, image_path, image_name)
+                output_path = f'{video_directory}/video_{quote_key}_{image_name}_{idx + 1}.mp4'
+                outputs = [video_encoder.variant_path(output_path, profile, len(profiles) == 1) for profile in profiles]
+                pending[quote_key] = (output_path, {'inputs': digest, 'source': source_image, 'outputs': outputs})
+                yield output_path, (
+                    quote, output_path, image_path, image_name, profile_names, audio_track, args.caption_effect,
+                    template
+                )
+
+    # Jedes Video ist ein eigener Job (mit --workers > 1 parallel)
+    def upload_variants(_, written):
+        for path in written:
+            uploader.submit(path)
+
+    on_success = upload_variants if uploader else None
+    results, failures = render_pool.run_jobs(create_video_with_quote, iter_jobs(), args.workers, on_success)
+
+    # Nur erfolgreich gerenderte Videos ins Manifest übernehmen
+    failed_jobs = {output_path for output_path, _ in failures}
+    for quote_key, (job_name, entry) in pending.items():
+        if job_name not in failed_jobs:
+            manifest[quote_key] = entry
+    render_manifest.save_manifest(manifest_path, manifest)
+    if args.output_list:
+        render_manifest.write_output_list(args.output_list, [path for paths in results.values() for path in paths])
+
+    # Rotationsstand speichern, damit der nächste Lauf die Bildauswahl ohne Wiederholung fortsetzt
+    if os.path.exists(image_directory):
+        asset_index.get_index(image_directory).save()
+
+    for output_path, error in failures:
+        log_with_color(f"\n Fehler bei {output_path}:\n{error}\n", Fore.RED)
+    job_count = len(results) + len(failures)
+    if job_count or hits:
+        log_with_color(
+            f"\n {len(results)}/{job_count} Videos erstellt. "
+            f"Manifest: {hits} Zitate unverändert übernommen, {len(pending)} Zitate neu gerendert.\n",
+            Fore.GREEN
+        )
     else:
-        log_with_color("\n Keine Zitate in der CSV gefunden.\n", Fore.RED, 1.5)
+        log_with_color("\n Keine Zitate in der CSV gefunden.\n", Fore.RED)
+
+    upload_failures = []
+    if uploader:
+        upload_results = uploader.close()
+        upload_failures = aws.failed_uploads(upload_results)
+        log_with_color(f"\n{aws.format_upload_report(upload_results)}\n", Fore.CYAN)
+
+    # Zeige, wo die Renderzeit tatsächlich hingeht, und speichere den Laufbericht
+    report_path = timing.write_report(args.report or timing.default_report_path('video'))
+    log_with_color(f"\n{timing.format_summary()}\n\n Laufbericht gespeichert unter: {report_path}\n", Fore.CYAN)
     
-    log_with_color("\n\n [7/7] Hauptprozess abgeschlossen.\n\n", Fore.GREEN, 1.5)
+    log_with_color("\n\n [7/7] Hauptprozess abgeschlossen.\n\n", Fore.GREEN)
+
+    # Fehlgeschlagene Videos und Uploads als Fehler melden (CI-Lauf bzw. Job in der Warteschlange schlägt fehl)
+    if failures or upload_failures:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,257 @@
+import os
+import sys
+import csv
+import json
+import random
+import asyncio
+import hashlib
+import logging
+import argparse
+from dotenv import load_dotenv
+
+########################################       LOG Section      ########################################
+
+logger = logging.getLogger(__name__)
+
+########################################       OPENAI Section      ########################################
+
+# Lade die Umgebungsvariablen aus der .env-Datei
+load_dotenv()
+
+# Standardmodell und -prompt für die Zitat-Generierung
+default_model = 'gpt-3.5-turbo-0125'
+default_prompt = 'Generate an inspirational quote'
+
+########################################       PATH Section      ########################################
+
+# Datei, in der Antworten liegen, die noch nicht in der CSV gespeichert sind (z. B. nach einem Absturz)
+cache_file = 'cache/quotes/responses.json'
+
+##########################################################################################################
+
+########################################       BACKEND Section      ########################################
+
+##########################################################################################################
+
+
+def openai_backend(model=default_model, base_url=None, max_tokens=50):
+    """Erzeugt ein Backend für die OpenAI Chat-API.
+
+    Ein Backend ist eine async-Funktion prompt -> Text mit einem Attribut "name" für den Cache-Schlüssel.
+    Mit base_url (oder OPENAI_BASE_URL) lässt sich ein lokaler Stub-Server ohne Netzwerk ansprechen.
+    """
+    from openai import AsyncOpenAI
+
+    # Wiederholungen übernimmt generate_quotes selbst, damit das Backoff für alle Backends gleich ist
+    client = AsyncOpenAI(base_url=base_url, max_retries=0)
+
+    async def complete(prompt):
+        response = await client.chat.completions.create(
+            model=model,
+            messages=[{'role': 'user', 'content': prompt}],
+            max_tokens=max_tokens,
+        )
+        return response.choices[0].message.content
+
+    complete.name = f'openai:{model}'
+    return complete
+
+
+##########################################################################################################
+
+########################################       CACHE Section      ########################################
+
+##########################################################################################################
+
+
+def load_cache(path=cache_file):
+    """Lädt den Antwort-Cache (Schlüssel -> Liste noch nicht gespeicherter Antworten) von der Platte."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, mode='r', encoding='utf-8') as file:
+        cache = json.load(file)
+    # Einträge älterer Cache-Formate (eine Antwort pro Schlüssel) verwerfen
+    return {key: answers for key, answers in cache.items() if isinstance(answers, list)}
+
+
+def save_cache(cache, path=cache_file):
+    """Speichert den Antwort-Cache atomar (leere Einträge entfallen)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, mode='w', encoding='utf-8') as file:
+        json.dump({key: answers for key, answers in cache.items() if answers}, file, indent=2, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def cache_key(backend, prompt):
+    """Schlüssel der offenen Antworten eines Prompts für ein Backend."""
+    name = getattr(backend, 'name', getattr(backend, '__name__', 'backend'))
+    return hashlib.sha256(f'{name}\x1f{prompt}'.encode('utf-8')).hexdigest()
+
+
+def release_answers(cache, backend, prompt, count):
+    """Entfernt die ersten count offenen Antworten eines Prompts, sobald sie verarbeitet (gespeichert) sind."""
+    key = cache_key(backend, prompt)
+    cache[key] = cache.get(key, [])[count:]
+
+
+##########################################################################################################
+
+########################################       QUOTE Section      ########################################
+
+##########################################################################################################
+
+
+def clean_quote(text):
+    """Entfernt Leerraum und umschließende Anführungszeichen aus einer Modellantwort."""
+    return text.strip().strip('"“”„\'').strip()
+
+
+def normalize_quote(text):
+    """Normalisiert ein Zitat für den Duplikatvergleich."""
+    return ' '.join(clean_quote(text).casefold().split())
+
+
+async def _complete_with_retry(backend, prompt, semaphore, retries, backoff):
+    """Führt eine Anfrage mit begrenzter Parallelität und exponentiellem Backoff aus."""
+    for attempt in range(retries + 1):
+        async with semaphore:
+            try:
+                return await backend(prompt)
+            except Exception as error:
+                if attempt == retries:
+                    raise
+                logger.warning("Anfrage fehlgeschlagen (%s), Versuch %d/%d", error, attempt + 1, retries)
+        # Außerhalb der Semaphore warten, damit andere Anfragen den Platz nutzen können
+        await asyncio.sleep(backoff * (2 ** attempt) * (1 + random.random()))
+
+
+async def generate_quotes_async(prompts, backend, concurrency=4, retries=3, backoff=1.0, cache=None):
+    """Generiert für jeden Prompt ein Zitat; höchstens concurrency Anfragen laufen gleichzeitig.
+
+    Offene Antworten aus dem Cache (angefragt, aber nie in der CSV gespeichert, z. B. weil ein Lauf
+    abgebrochen ist) werden zuerst verwendet; nur für den Rest wird das Backend gefragt. Jede neue
+    Antwort wird sofort im Cache abgelegt, damit sie einen Absturz übersteht. Die Antworten bleiben
+    offen, bis der Aufrufer sie mit release_answers freigibt.
+    Gibt (Zitate, Fehler) zurück; ein Fehler ist ein Tupel (Prompt, Exception).
+    """
+    cache = {} if cache is None else cache
+    semaphore = asyncio.Semaphore(concurrency)
+
+    # Offene Antworten vorab zuteilen (jede nur einmal); neue Antworten werden erst danach angehängt
+    reused = {}
+    plan = []
+    for prompt in prompts:
+        pending = cache.setdefault(cache_key(backend, prompt), [])
+        index = reused.get(prompt, 0)
+        if index < len(pending):
+            reused[prompt] = index + 1
+            plan.append((prompt, pending[index]))
+        else:
+            plan.append((prompt, None))
+
+    async def fetch(prompt, answer):
+        if answer is None:
+            answer = await _complete_with_retry(backend, prompt, semaphore, retries, backoff)
+            cache[cache_key(backend, prompt)].append(answer)
+        return answer
+
+    results = await asyncio.gather(*(fetch(prompt, answer) for prompt, answer in plan), return_exceptions=True)
+
+    quotes = []
+    failures = []
+    for prompt, result in zip(prompts, results):
+        if isinstance(result, Exception):
+            failures.append((prompt, result))
+        else:
+            quotes.append(clean_quote(result))
+    return quotes, failures
+
+
+def read_existing_quotes(csv_file):
+    """Liest die bereits vorhandenen Zitate (erste Spalte) einer CSV-Datei."""
+    if not os.path.exists(csv_file):
+        return []
+    with open(csv_file, mode='r', newline='', encoding='utf-8') as file:
+        return [row[0] for row in csv.reader(file) if row]
+
+
+def save_quotes_to_csv(quotes, csv_file):
+    """Hängt alle Zitate mit einem einzigen Schreibvorgang an die CSV-Datei an."""
+    if not quotes:
+        return
+    with open(csv_file, mode='a', newline='', encoding='utf-8') as file:
+        csv.writer(file).writerows([quote] for quote in quotes)
+
+
+def generate_and_save_quotes(count, csv_file, prompt=default_prompt, backend=None, concurrency=4, retries=3,
+                             use_cache=True):
+    """Generiert count Zitate parallel, entfernt Duplikate (auch gegen die CSV) und speichert sie gesammelt.
+
+    Mit use_cache werden Antworten eines abgebrochenen Laufs, die nie in der CSV gelandet sind, zuerst
+    verwendet. Gibt (neue Zitate, Fehler) zurück.
+    """
+    backend = backend or openai_backend()
+    cache = load_cache() if use_cache else {}
+
+    try:
+        quotes, failures = asyncio.run(
+            generate_quotes_async([prompt] * count, backend, concurrency=concurrency, retries=retries, cache=cache)
+        )
+    finally:
+        # Bereits erhaltene Antworten auch bei einem Abbruch behalten; der nächste Lauf verwendet sie
+        if use_cache:
+            save_cache(cache)
+
+    known = {normalize_quote(quote) for quote in read_existing_quotes(csv_file)}
+    new_quotes = []
+    for quote in quotes:
+        normalized = normalize_quote(quote)
+        if quote and normalized not in known:
+            known.add(normalized)
+            new_quotes.append(quote)
+
+    save_quotes_to_csv(new_quotes, csv_file)
+    # Gespeicherte (und doppelte) Antworten sind verarbeitet und werden nicht erneut verwendet
+    release_answers(cache, backend, prompt, len(quotes))
+    if use_cache:
+        save_cache(cache)
+    logger.info("%d Zitate generiert, %d neu gespeichert, %d fehlgeschlagen", len(quotes), len(new_quotes), len(failures))
+    return new_quotes, failures
+
+
+##########################################################################################################
+
+########################################       MAIN Section      ########################################
+
+##########################################################################################################
+
+
+def main(argv=None):
+    """Generiert Zitate über die Kommandozeile und hängt sie an die CSV-Datei an."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Generiert Zitate mit der OpenAI API und speichert sie in der CSV.')
+    parser.add_argument('--count', type=int, default=10, help='Anzahl der Anfragen')
+    parser.add_argument('--csv', default='quote/quotes_example.csv', help='Ziel-CSV-Datei')
+    parser.add_argument('--prompt', default=default_prompt, help='Prompt für jede Anfrage')
+    parser.add_argument('--model', default=default_model, help='OpenAI-Modell')
+    parser.add_argument('--base-url', default=None, help='Alternative API-URL (z. B. lokaler Stub-Server)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Maximale Anzahl gleichzeitiger Anfragen')
+    parser.add_argument('--retries', type=int, default=3, help='Wiederholungen pro Anfrage')
+    parser.add_argument('--no-cache', action='store_true', help='Antwort-Cache nicht verwenden')
+    args = parser.parse_args(argv)
+
+    backend = openai_backend(model=args.model, base_url=args.base_url)
+    _, failures = generate_and_save_quotes(
+        args.count, args.csv, prompt=args.prompt, backend=backend, concurrency=args.concurrency,
+        retries=args.retries, use_cache=not args.no_cache
+    )
+    for prompt, error in failures:
+        logger.error("Anfrage für '%s' fehlgeschlagen: %s", prompt, error)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
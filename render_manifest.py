@@ -0,0 +1,89 @@
+import os
+import json
+import hashlib
+
+########################################       PATH Section      ########################################
+
+# Verzeichnis, in dem die Render-Manifeste gespeichert werden
+manifest_directory = 'cache/'
+
+# Mit 0 gilt ein Eintrag mit gleichen Eingaben auch ohne lokale Ausgabedateien als aktuell (z. B. in CI-Läufen,
+# die nur das Manifest, nicht aber die Videos früherer Läufe behalten)
+check_outputs = os.getenv('RENDER_MANIFEST_CHECK_OUTPUTS', '1') != '0'
+
+
+##########################################################################################################
+
+########################################       MANIFEST Section      ########################################
+
+##########################################################################################################
+
+
+def manifest_path(name):
+    """Gibt den Pfad des Manifests für eine Pipeline (z. B. "video", "slideshow") zurück."""
+    return os.path.join(manifest_directory, f'manifest_{name}.json')
+
+
+def load_manifest(path):
+    """Lädt ein Manifest (Eintragsschlüssel -> Eintrag) oder gibt ein leeres Manifest zurück."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, mode='r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_manifest(path, manifest):
+    """Speichert das Manifest atomar, damit ein abgebrochener Lauf es nicht beschädigt."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, mode='w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=2, ensure_ascii=False, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def inputs_hash(*inputs):
+    """Berechnet einen stabilen Hash über alle Eingaben eines Render-Eintrags (JSON-serialisierbar)."""
+    payload = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def is_up_to_date(entry, digest):
+    """Prüft, ob ein Eintrag mit denselben Eingaben gerendert wurde und (mit check_outputs) alle Ausgaben existieren."""
+    if not entry or entry.get('inputs') != digest:
+        return False
+    return not check_outputs or all(os.path.exists(path) for path in entry.get('outputs', []))
+
+
+def write_output_list(path, outputs):
+    """Schreibt die in diesem Lauf neu erzeugten Dateien zeilenweise in eine Textdatei (z. B. für den Post-Job)."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, mode='w', encoding='utf-8') as file:
+        file.writelines(f'{output}\n' for output in outputs)
+
+
+def previous_source(entry):
+    """Gibt das zuletzt verwendete Hintergrundbild eines Eintrags zurück, falls es noch existiert."""
+    source = (entry or {}).get('source')
+    if source and os.path.exists(source):
+        return source
+    return None
+
+
+def add_force_argument(parser):
+    """Fügt einem argparse-Parser die Option --force hinzu."""
+    parser.add_argument(
+        '--force', action='store_true',
+        help='Alle Einträge neu rendern, auch wenn das Manifest sie als aktuell führt'
+    )
+
+
+def add_output_list_argument(parser):
+    """Fügt einem argparse-Parser die Option --output-list hinzu (siehe write_output_list)."""
+    parser.add_argument(
+        '--output-list', default=None,
+        help='Die in diesem Lauf neu erzeugten Dateien zeilenweise in diese Datei schreiben'
+    )
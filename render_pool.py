@@ -0,0 +1,118 @@
+import os
+import hashlib
+import itertools
+import logging
+import traceback
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import timing
+
+########################################       LOG Section      ########################################
+
+logger = logging.getLogger(__name__)
+
+
+##########################################################################################################
+
+########################################       WORKER Section      ########################################
+
+##########################################################################################################
+
+
+def resolve_worker_count(workers=None):
+    """Bestimmt die Anzahl der Worker (None = RENDER_WORKERS oder 1, 0 = alle Kerne)."""
+    if workers is None:
+        workers = int(os.getenv('RENDER_WORKERS', 1))
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+def add_worker_argument(parser):
+    """Fügt einem argparse-Parser die Option --workers hinzu."""
+    parser.add_argument(
+        '--workers', type=int, default=None,
+        help='Anzahl paralleler Render-Prozesse (0 = alle Kerne, Standard: RENDER_WORKERS oder 1)'
+    )
+
+
+def job_key(*parts):
+    """Erzeugt einen kurzen, deterministischen Schlüssel aus den Eingaben eines Jobs (für Dateinamen)."""
+    digest = hashlib.sha1('\x1f'.join(str(part) for part in parts).encode('utf-8'))
+    return digest.hexdigest()[:10]
+
+
+def _run_job(name, func, args):
+    """Führt einen Job aus und gibt statt einer Exception den Traceback zurück (plus Stufen-Zeiten)."""
+    # Nur die Messungen dieses Jobs zurückgeben, nicht die vom Elternprozess geerbten
+    start = timing.record_count()
+    with timing.job(name):
+        try:
+            return True, func(*args), timing.take_records(start)
+        except Exception:
+            return False, traceback.format_exc(), timing.take_records(start)
+
+
+def run_jobs(func, jobs, workers=None, on_success=None):
+    """Führt unabhängige Jobs (Iterable aus (Name, Argument-Tupel)) seriell oder im Prozess-Pool aus.
+
+    Gibt (Ergebnisse, Fehler) zurück: ein Dict Name -> Ergebnis und eine Liste aus (Name, Traceback).
+    Ein fehlgeschlagener Job bricht die übrigen Jobs nicht ab. on_success(Name, Ergebnis) wird im
+    Hauptprozess aufgerufen, sobald ein Job fertig ist (z. B. um die Ausgabe schon hochzuladen).
+    jobs darf ein Generator sein: der erste Job startet, sobald er erzeugt ist, und im Pool sind nie
+    mehr als doppelt so viele Jobs wie Worker eingereicht.
+    """
+    workers = resolve_worker_count(workers)
+    results = {}
+    failures = []
+    order = {}
+
+    def collect(name, ok, value, records):
+        # Die Messungen (ggf. aus den Worker-Prozessen) im Hauptprozess zusammenführen
+        timing.add_records(records)
+        if ok:
+            results[name] = value
+            if on_success:
+                on_success(name, value)
+        else:
+            failures.append((name, value))
+
+    # Mit mehreren Workern die ersten beiden Jobs vorziehen: ein einzelner Job braucht keinen Pool.
+    # Seriell wird nichts vorgezogen, damit der erste Job startet, bevor der zweite erzeugt wird.
+    jobs = iter(jobs)
+    serial = workers == 1
+    if not serial:
+        first_jobs = list(itertools.islice(jobs, 2))
+        jobs = itertools.chain(first_jobs, jobs)
+        serial = len(first_jobs) <= 1
+
+    if serial:
+        for name, args in jobs:
+            order[name] = len(order)
+            collect(name, *_run_job(name, func, args))
+        return results, failures
+
+    def collect_future(future, name):
+        try:
+            collect(name, *future.result())
+        except Exception:
+            # z. B. ein abgestürzter Worker-Prozess
+            collect(name, False, traceback.format_exc(), [])
+
+    logger.info("Starte Jobs mit %d Prozessen", workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for name, args in jobs:
+            order[name] = len(order)
+            futures[executor.submit(_run_job, name, func, args)] = name
+            if len(futures) >= workers * 2:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect_future(future, futures.pop(future))
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                collect_future(future, futures.pop(future))
+
+    # Reihenfolge der Fehler stabil halten, unabhängig davon, wann welcher Worker fertig wurde
+    failures.sort(key=lambda failure: order[failure[0]])
+    return results, failures
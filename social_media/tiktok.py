@@ -1,68 +1,251 @@
 import webbrowser
 import os
+import sys
+import json
+import hashlib
+import mmap
+import time
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
 
 client_key = os.getenv("TIKTOK_CLIENT_KEY")  # Dein Client Key
 redirect_uri = "https://ihsan06.github.io/takeiteasy/server/"  # Deine korrekte Redirect URI
 
 auth_url = f"https://www.tiktok.com/auth/authorize/?client_key={client_key}&scope=user.info.basic,video.upload&response_type=code&redirect_uri={redirect_uri}&state=random_state"
 
-# Öffne den Browser, um die OAuth-Seite zu öffnen
-webbrowser.open(auth_url)
-
-
-""" 
-
-import requests
-
-# Schritt 1: Upload-URL anfordern
-url = "https://open-api.tiktok.com/share/video/upload/"
-headers = {
-    "Authorization": "Bearer YOUR_ACCESS_TOKEN"
-}
-data = {
-    "open_id": "USER_OPEN_ID",  # Open ID des authentifizierten Benutzers
-}
-
-response = requests.post(url, headers=headers, data=data)
-upload_url = response.json().get("data").get("upload_url")
-
-# Schritt 2: Video an die Upload-URL senden
-video_file_path = "path_to_your_video.mp4"
-
-with open(video_file_path, "rb") as video_file:
-    video_upload_response = requests.post(upload_url, files={"video": video_file})
+# Basis-URL der Content Posting API (für Tests auf einen lokalen Stub-Server umstellbar)
+api_base = os.getenv("TIKTOK_API_BASE", "https://open.tiktokapis.com")
+
+# TikTok erlaubt Chunks zwischen 5 MB und 64 MB; der letzte Chunk nimmt den Rest auf
+min_chunk_size = 5 * 1024 * 1024
+max_chunk_size = 64 * 1024 * 1024
+default_chunk_size = 10 * 1024 * 1024
+
+# Verzeichnis für den Fortschritt laufender Uploads (zum Fortsetzen nach einem Abbruch)
+state_directory = 'cache/tiktok_uploads/'
+
+
+def open_authorization_page():
+    """Öffnet den Browser, um die OAuth-Seite zu öffnen."""
+    webbrowser.open(auth_url)
+
+
+def plan_chunks(video_size, chunk_size=default_chunk_size):
+    """Teilt eine Datei nach den TikTok-Regeln in Chunks auf und gibt eine Liste aus (Start, Ende) zurück."""
+    if video_size <= min_chunk_size:
+        return [(0, video_size)]
+    chunk_size = max(min_chunk_size, min(chunk_size, max_chunk_size, video_size))
+    total_chunk_count = video_size // chunk_size
+    chunks = [(index * chunk_size, (index + 1) * chunk_size) for index in range(total_chunk_count)]
+    # Der Rest wird an den letzten Chunk angehängt
+    chunks[-1] = (chunks[-1][0], video_size)
+    return chunks
+
+
+class TikTokUploader:
+    """Lädt Videos in Chunks über die Content Posting API hoch (init -> Chunks per PUT -> Status).
+
+    Alle Anfragen laufen über eine gemeinsame requests.Session mit Connection-Pool. Der Fortschritt
+    jedes Uploads wird nach jedem bestätigten Chunk gespeichert, sodass ein erneuter Aufruf nach einem
+    Fehler beim nächsten unbestätigten Chunk weitermacht.
+    """
+
+    def __init__(self, access_token, base_url=api_base, chunk_size=default_chunk_size, max_workers=3,
+                 retries=3, backoff=1.0, timeout=60, state_dir=state_directory):
+        self.base_url = base_url.rstrip('/')
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.state_dir = state_dir
+        self._state_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({"Authorization": f"Bearer {access_token}"})
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    ########################################       STATE Section      ########################################
+
+    def _state_path(self, video_path):
+        key = hashlib.sha1(os.path.abspath(video_path).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.state_dir, f'{key}.json')
+
+    def _load_state(self, video_path, video_size):
+        """Lädt den gespeicherten Fortschritt, sofern er zur aktuellen Datei passt."""
+        path = self._state_path(video_path)
+        if not os.path.exists(path):
+            return None
+        with open(path, mode='r', encoding='utf-8') as file:
+            state = json.load(file)
+        if state.get('video_size') != video_size or state.get('mtime') != os.path.getmtime(video_path):
+            return None
+        return state
+
+    def _save_state(self, video_path, state):
+        with self._state_lock:
+            os.makedirs(self.state_dir, exist_ok=True)
+            path = self._state_path(video_path)
+            temp_path = f'{path}.tmp'
+            with open(temp_path, mode='w', encoding='utf-8') as file:
+                json.dump(state, file)
+            os.replace(temp_path, path)
+
+    def _clear_state(self, video_path):
+        path = self._state_path(video_path)
+        if os.path.exists(path):
+            os.remove(path)
+
+    ########################################       API Section      ########################################
+
+    def _with_retry(self, action, description):
+        """Führt eine Anfrage mit exponentiellem Backoff erneut aus."""
+        for attempt in range(self.retries + 1):
+            try:
+                return action()
+            except requests.RequestException as error:
+                if attempt == self.retries:
+                    raise
+                logger.warning("%s fehlgeschlagen (%s), Versuch %d/%d", description, error, attempt + 1, self.retries)
+                time.sleep(self.backoff * (2 ** attempt))
+
+    def init_upload(self, video_size, chunks):
+        """Meldet einen Upload an und gibt (publish_id, upload_url) zurück."""
+        def action():
+            response = self.session.post(
+                f'{self.base_url}/v2/post/publish/inbox/video/init/',
+                json={"source_info": {
+                    "source": "FILE_UPLOAD",
+                    "video_size": video_size,
+                    "chunk_size": chunks[0][1] - chunks[0][0],
+                    "total_chunk_count": len(chunks),
+                }},
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            return response.json()["data"]
+
+        data = self._with_retry(action, "Upload-Initialisierung")
+        return data["publish_id"], data["upload_url"]
+
+    def upload_chunk(self, upload_url, data, start, end, video_size):
+        """Sendet einen Chunk per PUT mit Content-Range."""
+        def action():
+            response = self.session.put(
+                upload_url,
+                data=data,
+                headers={
+                    "Content-Type": "video/mp4",
+                    "Content-Length": str(end - start),
+                    "Content-Range": f"bytes {start}-{end - 1}/{video_size}",
+                },
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            return response
+
+        return self._with_retry(action, f"Chunk {start}-{end - 1}")
+
+    def fetch_status(self, publish_id):
+        """Fragt den Verarbeitungsstatus eines Uploads ab."""
+        response = self.session.post(
+            f'{self.base_url}/v2/post/publish/status/fetch/',
+            json={"publish_id": publish_id},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json()["data"]
+
+    ########################################       UPLOAD Section      ########################################
+
+    def upload_video(self, video_path):
+        """Lädt ein Video hoch (oder setzt einen abgebrochenen Upload fort) und gibt den Status zurück."""
+        video_size = os.path.getsize(video_path)
+        chunks = plan_chunks(video_size, self.chunk_size)
+
+        state = self._load_state(video_path, video_size)
+        if state is None:
+            publish_id, upload_url = self.init_upload(video_size, chunks)
+            state = {
+                'publish_id': publish_id,
+                'upload_url': upload_url,
+                'video_size': video_size,
+                'mtime': os.path.getmtime(video_path),
+                'next_chunk': 0,
+            }
+            self._save_state(video_path, state)
+        elif state['next_chunk']:
+            logger.info("Setze Upload von %s bei Chunk %d/%d fort", video_path, state['next_chunk'] + 1, len(chunks))
+
+        # Die Datei wird gemappt statt komplett gelesen; pro Anfrage liegt nur ein Chunk im Speicher
+        with open(video_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for index in range(state['next_chunk'], len(chunks)):
+                start, end = chunks[index]
+                self.upload_chunk(state['upload_url'], mapped[start:end], start, end, video_size)
+                state['next_chunk'] = index + 1
+                self._save_state(video_path, state)
+
+        status = self.fetch_status(state['publish_id'])
+        self._clear_state(video_path)
+        logger.info("Video hochgeladen: %s (publish_id %s)", video_path, state['publish_id'])
+        return status
+
+    def upload_videos(self, video_paths):
+        """Lädt mehrere Videos gleichzeitig hoch; gibt (Ergebnisse, Fehler) zurück."""
+        results = {}
+        failures = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.upload_video, path): path for path in video_paths}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    results[path] = future.result()
+                except Exception as error:
+                    failures.append((path, error))
+        return results, failures
+
+
+def main():
+    """Lädt die angegebenen Videos hoch oder öffnet ohne Videos die OAuth-Seite."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Lädt Videos zu TikTok hoch.')
+    parser.add_argument('videos', nargs='*', help='Pfade der Videos')
+    parser.add_argument('--chunk-size', type=int, default=default_chunk_size, help='Chunk-Größe in Bytes')
+    parser.add_argument('--workers', type=int, default=3, help='Anzahl gleichzeitiger Uploads')
+    args = parser.parse_args()
+
+    if not args.videos:
+        open_authorization_page()
+        return
+
+    access_token = os.getenv("TIKTOK_ACCESS_TOKEN")
+    if not access_token:
+        parser.error("TIKTOK_ACCESS_TOKEN ist nicht gesetzt")
+    with TikTokUploader(access_token, chunk_size=args.chunk_size, max_workers=args.workers) as uploader:
+        _, failures = uploader.upload_videos(args.videos)
+    for path, error in failures:
+        logger.error("Upload von %s fehlgeschlagen: %s", path, error)
+    if failures:
+        sys.exit(1)
 
-print(video_upload_response.json())
-
-
-
-
-
-import requests
-
-def upload_video_to_tiktok(video_path, access_token):
-    url = "https://open-api.tiktok.com/v1/media/upload/"
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-    }
-    files = {
-        "video": open(video_path, "rb")
-    }
-    data = {
-        "description": "Automated video upload"
-    }
-    response = requests.post(url, headers=headers, files=files, data=data)
-    
-    if response.status_code == 200:
-        print("Video successfully uploaded to TikTok!")
-    else:
-        print(f"Failed to upload video. Status code: {response.status_code}")
-        print(response.json())
 
 if __name__ == "__main__":
-    video_path = "output_videos/generated_video.mp4"
-    access_token = "YOUR_ACCESS_TOKEN"  # Ersetze das durch dein OAuth-Token
-    upload_video_to_tiktok(video_path, access_token)
-
-
-"""
+    main()
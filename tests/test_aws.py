@@ -0,0 +1,54 @@
+import boto3
+import pytest
+from moto import mock_aws
+from database import aws
+
+bucket = 'renders'
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    with mock_aws():
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket=bucket)
+        yield client
+
+
+def upload(client, paths):
+    with aws.S3BatchUploader(bucket, prefix='videos/', workers=2, queue_size=1, client=client) as uploader:
+        for path in paths:
+            uploader.submit(str(path))
+    return sorted(uploader.results, key=lambda result: result['file'])
+
+
+def test_uploads_then_skips_unchanged_files(client, tmp_path):
+    paths = [tmp_path / 'a.mp4', tmp_path / 'b.mp4']
+    for index, path in enumerate(paths):
+        path.write_bytes(bytes([index]) * 1024)
+
+    first = upload(client, paths)
+    assert [result['status'] for result in first] == ['uploaded', 'uploaded']
+    assert client.get_object(Bucket=bucket, Key='videos/a.mp4')['Body'].read() == paths[0].read_bytes()
+
+    paths[1].write_bytes(b'neu' * 100)
+    second = upload(client, paths)
+    assert [result['status'] for result in second] == ['skipped', 'uploaded']
+    assert aws.failed_uploads(second) == []
+
+
+def test_failed_uploads_are_reported_without_blocking(client, tmp_path):
+    present = tmp_path / 'present.mp4'
+    present.write_bytes(b'x' * 10)
+    # Mehr fehlende Dateien als Worker plus Warteschlange: ein toter Thread würde submit() blockieren
+    paths = [tmp_path / f'missing_{index}.mp4' for index in range(5)] + [present]
+
+    results = upload(client, paths)
+    assert len(results) == len(paths)
+    assert [result['file'] for result in aws.failed_uploads(results)] == [str(path) for path in paths[:5]]
+
+    uploader = aws.S3BatchUploader('missing-bucket', client=client)
+    uploader.submit(str(present))
+    assert [result['status'] for result in uploader.close()] == ['failed']
@@ -0,0 +1,55 @@
+import sys
+import pytest
+import benchmark
+
+
+def test_compare_ignores_sub_millisecond_noise():
+    baseline = {'get_data_from_csv': {'seconds': 0.0002}, 'peak_rss_mb': 100.0}
+    results = {'get_data_from_csv': {'seconds': 0.0004}, 'peak_rss_mb': 100.0}
+    assert benchmark.compare(results, baseline) == []
+
+
+def test_compare_reports_relative_and_absolute_regressions():
+    baseline = {'create_slideshow': {'seconds': 1.0}, 'peak_rss_mb': 100.0}
+    results = {'create_slideshow': {'seconds': 1.5}, 'peak_rss_mb': 200.0}
+    regressions = benchmark.compare(results, baseline)
+    assert [line.split(':')[0] for line in regressions] == ['create_slideshow', 'peak_rss_mb']
+
+
+def test_measure_video_skips_only_missing_dependencies(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'make_video', None)
+    assert 'skipped' in benchmark._measure_video('quotes.csv', 'background.png', 1)
+
+
+def test_measure_video_propagates_render_errors(monkeypatch, tmp_path):
+    class BrokenVideo:
+        video_directory = str(tmp_path)
+
+        @staticmethod
+        def get_quotes_from_csv(path):
+            raise ValueError('kaputte CSV')
+
+    monkeypatch.setitem(sys.modules, 'make_video', BrokenVideo)
+    with pytest.raises(ValueError):
+        benchmark._measure_video('quotes.csv', 'background.png', 1)
+
+
+def test_measure_video_uses_the_font_override(monkeypatch, tmp_path):
+    templates = []
+
+    class Video:
+        video_directory = str(tmp_path)
+        template_parameters = {'text': {'font_path': '/Library/Fonts/Arial Bold.ttf'}}
+
+        @staticmethod
+        def get_quotes_from_csv(path):
+            yield 0, 'Zitat'
+
+        @staticmethod
+        def create_video_with_quote(quote, output_path, image_path, image_name, template=None):
+            templates.append(template)
+
+    monkeypatch.setitem(sys.modules, 'make_video', Video)
+    benchmark._measure_video('quotes.csv', 'background.png', 1, font_path='/fonts/Other.ttf')
+    assert templates == [{'text': {'font_path': '/fonts/Other.ttf'}}]
+    assert Video.template_parameters['text']['font_path'] == '/Library/Fonts/Arial Bold.ttf'
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+import caption_animation
+import text_layout
+
+
+@pytest.mark.parametrize('effect', caption_animation.effects)
+def test_animated_caption_matches_static_caption(effect):
+    text = 'Gib niemals auf, denn jeder Tag ist eine neue Chance'
+    area = (40, 600, 640, 300)
+    font_path, font_size = text_layout.bundled_font, 48
+
+    static = text_layout.render_caption(text, font_path, font_size, area[2:])[:, :, 3] > 127
+    background = np.zeros((area[1] + area[3] + 100, area[0] + area[2] + 100, 3), dtype=np.uint8)
+    pieces = caption_animation.build_pieces(text, font_path, font_size, area, effect=effect, fade=0)
+    frames = list(caption_animation.caption_frames(background, pieces, (255, 255, 255), fps=1, duration=60))
+    animated = frames[-1][:, :, 0] > 127
+
+    # Gleiche Glyphen an gleicher Stelle wie in der statischen Bildunterschrift
+    x, y, width, height = area
+    assert np.array_equal(animated[y:y + height, x:x + width], static)
+    assert animated.sum() == static.sum()
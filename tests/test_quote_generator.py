@@ -0,0 +1,65 @@
+import asyncio
+import pytest
+import quote_generator
+
+
+def counting_backend():
+    """Stub-Backend, das jede Anfrage zählt und jedes Mal ein neues Zitat liefert."""
+    calls = []
+
+    async def complete(prompt):
+        calls.append(prompt)
+        return f'"Zitat Nummer {len(calls)}"'
+
+    complete.name = 'stub'
+    complete.calls = calls
+    return complete
+
+
+def test_repeated_runs_request_new_quotes(tmp_path, monkeypatch):
+    # Der Antwort-Cache liegt relativ zum Arbeitsverzeichnis
+    monkeypatch.chdir(tmp_path)
+    backend = counting_backend()
+    csv_file = str(tmp_path / 'quotes.csv')
+
+    runs = [quote_generator.generate_and_save_quotes(3, csv_file, backend=backend)[0] for _ in range(3)]
+
+    assert [len(quotes) for quotes in runs] == [3, 3, 3]
+    assert len(backend.calls) == 9
+    assert len(set(quote_generator.read_existing_quotes(csv_file))) == 9
+
+
+def test_answers_of_an_interrupted_run_are_reused(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    backend = counting_backend()
+    csv_file = str(tmp_path / 'quotes.csv')
+    save_quotes_to_csv = quote_generator.save_quotes_to_csv
+
+    def crash(quotes, path):
+        raise OSError('Platte voll')
+
+    # Der erste Lauf bekommt alle Antworten, stürzt aber vor dem Speichern in der CSV ab
+    monkeypatch.setattr(quote_generator, 'save_quotes_to_csv', crash)
+    with pytest.raises(OSError):
+        quote_generator.generate_and_save_quotes(3, csv_file, backend=backend)
+    monkeypatch.setattr(quote_generator, 'save_quotes_to_csv', save_quotes_to_csv)
+
+    quotes, failures = quote_generator.generate_and_save_quotes(3, csv_file, backend=backend)
+
+    assert failures == []
+    assert quotes == ['Zitat Nummer 1', 'Zitat Nummer 2', 'Zitat Nummer 3']
+    assert len(backend.calls) == 3
+    # Gespeicherte Antworten sind verbraucht; der Cache wächst nicht weiter
+    assert quote_generator.load_cache() == {}
+
+
+def test_pending_answers_are_used_once_before_new_requests():
+    backend = counting_backend()
+    key = quote_generator.cache_key(backend, 'a')
+    cache = {key: ['"Offen"']}
+
+    quotes, _ = asyncio.run(quote_generator.generate_quotes_async(['a', 'a', 'a'], backend, cache=cache))
+
+    assert quotes == ['Offen', 'Zitat Nummer 1', 'Zitat Nummer 2']
+    assert len(backend.calls) == 2
+    assert cache[key] == ['"Offen"', '"Zitat Nummer 1"', '"Zitat Nummer 2"']
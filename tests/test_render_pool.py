@@ -0,0 +1,16 @@
+import render_pool
+
+
+def test_serial_jobs_start_before_the_next_job_is_generated():
+    events = []
+
+    def jobs():
+        for name in ('a', 'b', 'c'):
+            events.append(f'erzeugt {name}')
+            yield name, (name,)
+
+    results, failures = render_pool.run_jobs(lambda name: events.append(f'gerendert {name}') or name, jobs(), workers=1)
+
+    assert failures == []
+    assert results == {'a': 'a', 'b': 'b', 'c': 'c'}
+    assert events == ['erzeugt a', 'gerendert a', 'erzeugt b', 'gerendert b', 'erzeugt c', 'gerendert c']
@@ -0,0 +1,37 @@
+import pytest
+import text_layout
+
+
+@pytest.fixture(autouse=True)
+def clear_font_cache():
+    text_layout.resolve_font.cache_clear()
+    text_layout.get_font.cache_clear()
+    yield
+    text_layout.resolve_font.cache_clear()
+    text_layout.get_font.cache_clear()
+
+
+def test_existing_font_is_used_as_is():
+    assert text_layout.resolve_font(text_layout.bundled_font) == text_layout.bundled_font
+
+
+def test_missing_template_font_falls_back(monkeypatch):
+    monkeypatch.setattr(text_layout, 'fallback_fonts', ('NoSuchFont.ttf',))
+    monkeypatch.setattr(text_layout, '_fc_match', lambda font_path: None)
+    assert text_layout.resolve_font('/Library/Fonts/Missing Bold.ttf') == text_layout.bundled_font
+    # Die Vorlage rendert trotzdem
+    caption = text_layout.render_caption('Ein Zitat', '/Library/Fonts/Missing Bold.ttf', 40, (400, 200))
+    assert caption[:, :, 3].any()
+
+
+def test_override_wins_over_template_font(monkeypatch):
+    monkeypatch.setattr(text_layout, 'font_override', text_layout.bundled_font)
+    assert text_layout.resolve_font('/Library/Fonts/Arial Bold.ttf') == text_layout.bundled_font
+
+
+def test_with_font_does_not_modify_the_template():
+    template = {'text': {'font_path': 'a.ttf', 'font_size': 40}}
+    changed = text_layout.with_font(template, 'b.ttf')
+    assert changed['text'] == {'font_path': 'b.ttf', 'font_size': 40}
+    assert template['text']['font_path'] == 'a.ttf'
+    assert text_layout.with_font(template, None) is template
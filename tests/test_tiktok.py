@@ -0,0 +1,92 @@
+import os
+import functools
+import pytest
+import requests
+from social_media import tiktok
+from tiktok_stub import TikTokStub
+
+MB = 1024 * 1024
+
+
+def write_video(path, size):
+    data = os.urandom(size)
+    path.write_bytes(data)
+    return data
+
+
+def test_plan_chunks_small_file_is_one_chunk():
+    assert tiktok.plan_chunks(1000) == [(0, 1000)]
+    assert tiktok.plan_chunks(5 * MB) == [(0, 5 * MB)]
+
+
+def test_plan_chunks_appends_remainder_to_last_chunk():
+    assert tiktok.plan_chunks(25 * MB, 10 * MB) == [(0, 10 * MB), (10 * MB, 25 * MB)]
+
+
+def test_plan_chunks_clamps_chunk_size_to_tiktok_limits():
+    # Zu kleine Chunks werden auf 5 MB angehoben, zu große auf 64 MB begrenzt
+    assert tiktok.plan_chunks(12 * MB, 1 * MB) == [(0, 5 * MB), (5 * MB, 12 * MB)]
+    chunks = tiktok.plan_chunks(200 * MB, 100 * MB)
+    assert chunks[0] == (0, 64 * MB)
+    assert chunks[-1][1] == 200 * MB
+    assert all(end - start >= 5 * MB for start, end in chunks)
+
+
+def test_concurrent_uploads_deliver_every_byte(tmp_path):
+    videos = {tmp_path / 'small.mp4': 4096, tmp_path / 'a.mp4': 11 * MB, tmp_path / 'b.mp4': 11 * MB}
+    contents = {str(path): write_video(path, size) for path, size in videos.items()}
+
+    with TikTokStub(chunk_delay=0.2) as stub:
+        with tiktok.TikTokUploader('token', base_url=stub.base_url, chunk_size=5 * MB, max_workers=3,
+                                   state_dir=str(tmp_path / 'state')) as uploader:
+            results, failures = uploader.upload_videos(list(contents))
+
+        assert failures == []
+        assert stub.init_calls == 3
+        assert stub.max_active >= 2
+        received = {stub.received(publish_id) for publish_id in stub.uploads}
+        assert received == set(contents.values())
+        assert all(status['status'] == 'SEND_TO_USER_INBOX' for status in results.values())
+
+
+def test_failed_upload_resumes_at_next_chunk(tmp_path):
+    video = tmp_path / 'video.mp4'
+    content = write_video(video, 16 * MB)
+
+    with TikTokStub(fail_chunks={10 * MB}) as stub:
+        with tiktok.TikTokUploader('token', base_url=stub.base_url, chunk_size=5 * MB, retries=0,
+                                   state_dir=str(tmp_path / 'state')) as uploader:
+            with pytest.raises(requests.HTTPError):
+                uploader.upload_video(str(video))
+            status = uploader.upload_video(str(video))
+
+        # Kein zweites init, und die bestätigten Chunks werden nicht erneut gesendet
+        assert stub.init_calls == 1
+        assert [start for _, start in stub.chunk_calls] == [0, 5 * MB, 10 * MB, 10 * MB]
+        assert stub.received('publish_1') == content
+        assert status['status'] == 'SEND_TO_USER_INBOX'
+        assert not os.listdir(tmp_path / 'state')
+
+
+def test_main_fails_fast_without_access_token(tmp_path, monkeypatch):
+    video = tmp_path / 'video.mp4'
+    write_video(video, 1000)
+    monkeypatch.delenv('TIKTOK_ACCESS_TOKEN', raising=False)
+    monkeypatch.setattr('sys.argv', ['tiktok.py', str(video)])
+    with pytest.raises(SystemExit) as exit_info:
+        tiktok.main()
+    assert exit_info.value.code != 0
+
+
+def test_main_exits_non_zero_on_failed_upload(tmp_path, monkeypatch):
+    video = tmp_path / 'video.mp4'
+    write_video(video, 1000)
+    with TikTokStub(fail_chunks={0}) as stub:
+        monkeypatch.setenv('TIKTOK_ACCESS_TOKEN', 'token')
+        monkeypatch.setattr(tiktok, 'TikTokUploader', functools.partial(
+            tiktok.TikTokUploader, base_url=stub.base_url, retries=0, state_dir=str(tmp_path / 'state')
+        ))
+        monkeypatch.setattr('sys.argv', ['tiktok.py', str(video)])
+        with pytest.raises(SystemExit) as exit_info:
+            tiktok.main()
+    assert exit_info.value.code == 1
@@ -0,0 +1,102 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class TikTokStub:
+    """Lokaler HTTP-Stub für das Upload-Protokoll der Content Posting API (init -> PUT-Chunks -> Status).
+
+    fail_chunks enthält Chunk-Startpositionen, deren erster PUT mit 500 beantwortet wird.
+    """
+
+    def __init__(self, fail_chunks=(), chunk_delay=0.0):
+        self.fail_chunks = set(fail_chunks)
+        self.chunk_delay = chunk_delay
+        self.uploads = {}
+        self.init_calls = 0
+        self.chunk_calls = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.base_url = f'http://127.0.0.1:{self.server.server_port}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def received(self, publish_id):
+        """Gibt die bisher empfangenen Bytes eines Uploads zusammengesetzt zurück."""
+        upload = self.uploads[publish_id]
+        return b''.join(upload['chunks'][start] for start in sorted(upload['chunks']))
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, payload=None):
+                body = json.dumps(payload or {}).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _json(self):
+                return json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+
+            def do_POST(self):
+                if self.path == '/v2/post/publish/inbox/video/init/':
+                    source = self._json()['source_info']
+                    with stub.lock:
+                        stub.init_calls += 1
+                        publish_id = f'publish_{stub.init_calls}'
+                        stub.uploads[publish_id] = {'video_size': source['video_size'], 'chunks': {}}
+                    self._reply(200, {'data': {
+                        'publish_id': publish_id, 'upload_url': f'{stub.base_url}/upload/{publish_id}'
+                    }})
+                elif self.path == '/v2/post/publish/status/fetch/':
+                    publish_id = self._json()['publish_id']
+                    upload = stub.uploads[publish_id]
+                    complete = len(stub.received(publish_id)) == upload['video_size']
+                    self._reply(200, {'data': {'status': 'SEND_TO_USER_INBOX' if complete else 'PROCESSING_UPLOAD'}})
+                else:
+                    self._reply(404)
+
+            def do_PUT(self):
+                match = re.fullmatch(r'/upload/(\w+)', self.path)
+                content_range = re.fullmatch(r'bytes (\d+)-(\d+)/(\d+)', self.headers.get('Content-Range', ''))
+                if not match or not content_range or match.group(1) not in stub.uploads:
+                    self._reply(400)
+                    return
+                start, end = int(content_range.group(1)), int(content_range.group(2))
+                data = self.rfile.read(int(self.headers['Content-Length']))
+                with stub.lock:
+                    stub.chunk_calls.append((match.group(1), start))
+                    stub.active += 1
+                    stub.max_active = max(stub.max_active, stub.active)
+                    fail = start in stub.fail_chunks
+                    stub.fail_chunks.discard(start)
+                try:
+                    time.sleep(stub.chunk_delay)
+                    if fail or len(data) != end - start + 1:
+                        self._reply(500)
+                        return
+                    with stub.lock:
+                        stub.uploads[match.group(1)]['chunks'][start] = data
+                    self._reply(201)
+                finally:
+                    with stub.lock:
+                        stub.active -= 1
+
+        return Handler
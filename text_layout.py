@@ -0,0 +1,236 @@
+import os
+import shutil
+import logging
+import subprocess
+from collections import namedtuple
+from functools import lru_cache
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+########################################       LOG Section      ########################################
+
+logger = logging.getLogger(__name__)
+
+########################################       PATH Section      ########################################
+
+# Erzwingt eine Schrift für alle Vorlagen (z. B. auf einem Rechner ohne die Schriften der Vorlage)
+font_override = os.getenv('TEXT_FONT_PATH') or None
+
+# Ersatzschriften, falls die Schrift der Vorlage fehlt (z. B. die macOS-Pfade auf einem Linux-Runner);
+# Pillow sucht Dateinamen ohne Pfad in den Schriftverzeichnissen des Systems
+fallback_fonts = ('DejaVuSans-Bold.ttf', 'LiberationSans-Bold.ttf', 'Arial Bold.ttf', 'DejaVuSans.ttf')
+
+# Mitgelieferte Schrift als letzter Ausweg, damit das Rendern nie an einer fehlenden Systemschrift scheitert
+bundled_font = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts', 'DejaVuSans-Bold.ttf')
+
+
+##########################################################################################################
+
+########################################       FONT Section      ########################################
+
+##########################################################################################################
+
+
+def _loadable(font_path):
+    """Prüft, ob Pillow die Schrift öffnen kann (Pfad oder Dateiname in den Schriftverzeichnissen)."""
+    try:
+        ImageFont.truetype(font_path, 10)
+    except OSError:
+        return False
+    return True
+
+
+def _fc_match(font_path):
+    """Fragt fontconfig nach der nächstliegenden Systemschrift (nur, wenn fc-match installiert ist)."""
+    if not shutil.which('fc-match'):
+        return None
+    family = os.path.splitext(os.path.basename(font_path))[0]
+    result = subprocess.run(['fc-match', '--format=%{file}', family], capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+@lru_cache(maxsize=None)
+def resolve_font(font_path):
+    """Gibt die tatsächlich verwendete Schriftdatei für den Schriftpfad einer Vorlage zurück.
+
+    Reihenfolge: TEXT_FONT_PATH (ohne Ersatz, ein Tippfehler soll auffallen), der Pfad selbst, die
+    fallback_fonts, fc-match und zuletzt die mitgelieferte DejaVu Sans Bold.
+    """
+    if font_override:
+        return font_override
+    if _loadable(font_path):
+        return font_path
+    for candidate in fallback_fonts + (_fc_match(font_path), bundled_font):
+        if candidate and _loadable(candidate):
+            logger.warning("Schrift %s nicht gefunden, verwende %s", font_path, candidate)
+            return candidate
+    raise OSError(f"Keine Schrift für {font_path} gefunden (auch keine Ersatzschrift)")
+
+
+@lru_cache(maxsize=None)
+def get_font(font_path, font_size):
+    """Lädt eine TrueType-Schriftart einmal pro Prozess und gibt sie danach aus dem Cache zurück.
+
+    Fehlt die Schrift auf diesem Rechner, wird eine Ersatzschrift verwendet (siehe resolve_font).
+    """
+    return ImageFont.truetype(resolve_font(font_path), font_size)
+
+
+def add_font_argument(parser):
+    """Fügt einem argparse-Parser die Option --font hinzu (siehe with_font)."""
+    parser.add_argument(
+        '--font', default=None,
+        help='Schriftdatei (TrueType) statt der Schrift der Vorlage, z. B. auf Rechnern ohne die Vorlagen-Schrift'
+    )
+
+
+def with_font(template, font_path):
+    """Gibt eine Kopie der Vorlage mit anderer Schrift zurück (ohne Schrift unverändert die Vorlage)."""
+    if not font_path:
+        return template
+    return dict(template, text=dict(template['text'], font_path=font_path))
+
+
+# (Schriftpfad, Größe, Text) -> Breite in Pixeln
+_text_widths = {}
+
+
+def text_width(font_path, font_size, text):
+    """Gibt die Laufweite eines Wortes (oder Leerzeichens) zurück, gemerkt pro Schriftart."""
+    key = (font_path, font_size, text)
+    width = _text_widths.get(key)
+    if width is None:
+        width = get_font(font_path, font_size).getlength(text)
+        _text_widths[key] = width
+    return width
+
+
+##########################################################################################################
+
+########################################       LAYOUT Section      ########################################
+
+##########################################################################################################
+
+
+# Eine Zeile des Layouts: Text, Bounding-Box-Breite/-Höhe und y-Versatz relativ zum Blockanfang
+LayoutLine = namedtuple('LayoutLine', ['text', 'width', 'height', 'y'])
+
+# Das gesamte Layout: Zeilen, Summe der Zeilenhöhen (ohne Abstände) und Gesamthöhe inklusive Abstände
+TextLayout = namedtuple('TextLayout', ['lines', 'text_height', 'height'])
+
+
+def wrap_text(text, font_path, font_size, max_width):
+    """Bricht den Text wortweise um; jeder Absatz (\\n) endet mit einer Leerzeile.
+
+    Die Zeilenbreite wird aus den gemerkten Wortbreiten aufsummiert, statt für jedes Wort
+    die wachsende Zeile neu zu vermessen.
+    """
+    space_width = text_width(font_path, font_size, ' ')
+    lines = []
+    for paragraph in text.split('\n'):
+        current_words = []
+        current_width = 0
+        for word in paragraph.split():
+            word_width = text_width(font_path, font_size, word)
+            line_width = current_width + space_width + word_width if current_words else word_width
+            if line_width <= max_width or not current_words:
+                current_words.append(word)
+                current_width = line_width
+            else:
+                lines.append(' '.join(current_words))
+                current_words = [word]
+                current_width = word_width
+        lines.append(' '.join(current_words))
+        lines.append('')  # Leere Zeile hinzufügen, um einen Absatz zu erzeugen
+    return lines
+
+
+@lru_cache(maxsize=1024)
+def layout_text(text, font_path, font_size, max_width, line_padding):
+    """Berechnet Umbruch und Zeilenmaße eines Textblocks (gecacht über Text, Schrift, Größe und Breite)."""
+    font = get_font(font_path, font_size)
+    lines = []
+    y = 0
+    text_height = 0
+    for line in wrap_text(text, font_path, font_size, max_width):
+        left, top, right, bottom = font.getbbox(line)
+        line_height = bottom - top
+        lines.append(LayoutLine(line, right - left, line_height, y))
+        text_height += line_height
+        y += line_height + line_padding
+    return TextLayout(tuple(lines), text_height, y)
+
+
+def block_height(layout):
+    """Gibt die Höhe des Textblocks von der ersten bis zur letzten nicht leeren Zeile zurück."""
+    lines = [line for line in layout.lines if line.text]
+    return lines[-1].y + lines[-1].height if lines else 0
+
+
+@lru_cache(maxsize=1024)
+def fit_text(text, font_path, font_size, max_width, max_height, line_padding, min_font_size=12):
+    """Verkleinert die Schrift ab font_size, bis der umbrochene Text in max_width x max_height passt.
+
+    Gibt (Schriftgröße, Layout) zurück; passt der Text auch in min_font_size nicht, wird diese verwendet.
+    """
+    for size in range(font_size, min_font_size - 1, -1):
+        layout = layout_text(text, font_path, size, max_width, line_padding)
+        if block_height(layout) <= max_height and max(line.width for line in layout.lines) <= max_width:
+            return size, layout
+    return min_font_size, layout_text(text, font_path, min_font_size, max_width, line_padding)
+
+
+##########################################################################################################
+
+########################################       RENDER Section      ########################################
+
+##########################################################################################################
+
+
+@lru_cache(maxsize=16)
+def render_text_layer(text, font_path, font_size, canvas_width, max_width, line_padding,
+                      fill='white', stroke_fill='black', stroke_width=5):
+    """Rastert einen umrandeten Textblock einmal in eine transparente RGBA-Ebene.
+
+    Umrandung und Füllung entstehen in einem draw.text-Aufruf pro Zeile (FreeType-Stroker) statt
+    in fünf versetzten Durchläufen. Die Ebene hängt nicht vom Hintergrund ab und wird deshalb
+    gecacht; der Aufrufer setzt sie mit einer einzigen Alpha-Operation auf das Bild.
+    Gibt (Ebene, Layout, Rand) zurück; die erste Zeile beginnt in der Ebene bei y = Rand.
+    """
+    layout = layout_text(text, font_path, font_size, max_width, line_padding)
+    font = get_font(font_path, font_size)
+    margin = stroke_width * 2
+    layer = Image.new('RGBA', (canvas_width, layout.height + 2 * margin), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+    for line in layout.lines:
+        if not line.text:
+            continue
+        x_position = (canvas_width - line.width) // 2
+        draw.text((x_position, margin + line.y), line.text, font=font, fill=fill,
+                  stroke_width=stroke_width, stroke_fill=stroke_fill)
+    return layer, layout, margin
+
+
+@lru_cache(maxsize=16)
+def render_caption(text, font_path, font_size, size, color=(0, 0, 0), line_padding=10, min_font_size=12):
+    """Rastert eine Bildunterschrift in-process in ein RGBA-Array der Größe size = (Breite, Höhe).
+
+    Ersatz für moviepys TextClip(method='caption'), der für jedes Video ImageMagick startet: der Text
+    wird umgebrochen, bei Bedarf verkleinert, bis er in den Bereich passt, und zeilenweise horizontal
+    und als Block vertikal zentriert. Das Array (Höhe x Breite x 4, uint8) kann direkt an ImageClip
+    übergeben werden; der Alphakanal wird dabei zur Maske.
+    """
+    width, height = size
+    font_size, layout = fit_text(text, font_path, font_size, width, height, line_padding, min_font_size)
+    font = get_font(font_path, font_size)
+    layer = Image.new('RGBA', (width, height), tuple(color) + (0,))
+    draw = ImageDraw.Draw(layer)
+    top = max(0, (height - block_height(layout)) // 2)
+    for line in layout.lines:
+        if not line.text:
+            continue
+        # Die Glyphen beginnen nicht bei y = 0 der Schrift; um den oberen Rand der Bounding-Box verschieben
+        left, line_top = font.getbbox(line.text)[:2]
+        draw.text(((width - line.width) // 2 - left, top + line.y - line_top), line.text, font=font,
+                  fill=tuple(color) + (255,))
+    return np.asarray(layer)
@@ -0,0 +1,143 @@
+import os
+import csv
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+########################################       PATH Section      ########################################
+
+# Verzeichnis, in dem die Laufberichte gespeichert werden
+report_directory = 'reports/'
+
+
+##########################################################################################################
+
+########################################       TIMER Section      ########################################
+
+##########################################################################################################
+
+
+# Gemessene Zeiten dieses Prozesses: Liste aus {"job", "stage", "seconds"}
+_records = []
+
+# Name des Jobs, zu dem die aktuell gemessenen Stufen gehören
+_current_job = None
+
+
+@contextmanager
+def job(name):
+    """Ordnet alle innerhalb des Blocks gemessenen Stufen dem angegebenen Job zu."""
+    global _current_job
+    previous_job = _current_job
+    _current_job = name
+    try:
+        yield
+    finally:
+        _current_job = previous_job
+
+
+@contextmanager
+def stage(name):
+    """Misst die Dauer einer Pipeline-Stufe (z. B. "csv_load", "encode") und zeichnet sie auf."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def record(name, seconds):
+    """Zeichnet eine bereits gemessene Dauer auf (z. B. über viele kleine Abschnitte eines Generators summiert)."""
+    _records.append({
+        'job': _current_job,
+        'stage': name,
+        'seconds': seconds,
+    })
+
+
+def record_count():
+    """Gibt die Anzahl der bisher gemessenen Zeiten zurück."""
+    return len(_records)
+
+
+def take_records(start=0):
+    """Gibt die Messungen ab Position start zurück und entfernt sie (für Worker-Prozesse)."""
+    records = _records[start:]
+    del _records[start:]
+    return records
+
+
+def add_records(records):
+    """Übernimmt die Messungen eines anderen Prozesses."""
+    _records.extend(records)
+
+
+def get_records():
+    """Gibt eine Kopie aller Messungen zurück."""
+    return list(_records)
+
+
+##########################################################################################################
+
+########################################       REPORT Section      ########################################
+
+##########################################################################################################
+
+
+def summarize(records=None):
+    """Fasst die Messungen pro Stufe zusammen (Anzahl, Summe, Mittelwert, Maximum) in Messreihenfolge."""
+    summary = {}
+    for record in _records if records is None else records:
+        entry = summary.setdefault(record['stage'], {'count': 0, 'total': 0.0, 'max': 0.0})
+        entry['count'] += 1
+        entry['total'] += record['seconds']
+        entry['max'] = max(entry['max'], record['seconds'])
+    for entry in summary.values():
+        entry['mean'] = entry['total'] / entry['count']
+    return summary
+
+
+def format_summary(records=None):
+    """Erzeugt eine Übersichtstabelle der Stufen-Zeiten."""
+    summary = summarize(records)
+    grand_total = sum(entry['total'] for entry in summary.values()) or 1.0
+    lines = [f"{'Stufe':<16}{'Anzahl':>8}{'Summe (s)':>12}{'Mittel (s)':>12}{'Max (s)':>10}{'Anteil':>9}"]
+    for name, entry in summary.items():
+        lines.append(
+            f"{name:<16}{entry['count']:>8}{entry['total']:>12.3f}{entry['mean']:>12.3f}"
+            f"{entry['max']:>10.3f}{entry['total'] / grand_total:>9.1%}"
+        )
+    return '\n'.join(lines)
+
+
+def default_report_path(run_name):
+    """Gibt einen Berichtspfad mit Zeitstempel im Berichtsverzeichnis zurück."""
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return os.path.join(report_directory, f'{run_name}_{timestamp}.json')
+
+
+def write_report(path, records=None):
+    """Schreibt die Messungen als JSON (mit Zusammenfassung) oder CSV, je nach Dateiendung."""
+    records = get_records() if records is None else records
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    if path.endswith('.csv'):
+        with open(path, mode='w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=['job', 'stage', 'seconds'])
+            writer.writeheader()
+            writer.writerows(records)
+    else:
+        with open(path, mode='w', encoding='utf-8') as file:
+            json.dump({'records': records, 'summary': summarize(records)}, file, indent=2, ensure_ascii=False)
+    return path
+
+
+def add_report_argument(parser):
+    """Fügt einem argparse-Parser die Option --report hinzu."""
+    parser.add_argument(
+        '--report', default=None,
+        help='Pfad für den Laufbericht (.json oder .csv, Standard: reports/<skript>_<zeitstempel>.json)'
+    )
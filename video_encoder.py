@@ -0,0 +1,373 @@
+import os
+import queue
+import logging
+import threading
+import subprocess
+import tempfile
+import numpy as np
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from moviepy.config import get_setting
+from moviepy.editor import CompositeVideoClip, ImageClip
+import timing
+import audio_cache
+
+########################################       LOG Section      ########################################
+
+logger = logging.getLogger(__name__)
+
+
+##########################################################################################################
+
+########################################       STATIC Section      ########################################
+
+##########################################################################################################
+
+
+def _is_static_image_clip(clip):
+    """Prüft, ob ein Clip ein unveränderliches Bild an einer festen Position ist."""
+    if not isinstance(clip, ImageClip):
+        return False
+
+    # ImageClip.make_frame gibt immer dasselbe Array zurück, solange kein zeitabhängiger Filter (fl) aktiv ist
+    sample_times = [0, clip.duration / 2, clip.duration] if clip.duration else [0]
+    if any(clip.make_frame(t) is not clip.img for t in sample_times):
+        return False
+
+    # set_position speichert auch feste Positionen als Funktion, daher an mehreren Zeitpunkten vergleichen
+    if len({tuple(clip.pos(t)) for t in sample_times}) != 1:
+        return False
+
+    return clip.mask is None or _is_static_image_clip(clip.mask)
+
+
+def is_static_composition(video):
+    """Prüft, ob sich eine Komposition über ihre gesamte Dauer nicht verändert."""
+    if isinstance(video, CompositeVideoClip):
+        if video.bg is not None and not isinstance(video.bg, ImageClip):
+            return False
+        return all(_is_static_image_clip(clip) for clip in video.clips)
+    return _is_static_image_clip(video)
+
+
+##########################################################################################################
+
+########################################       PROFILE Section      ########################################
+
+##########################################################################################################
+
+
+# Ausgabeprofil: Auflösung (None = Quellgröße), fps, Codec, Preset, Bitrate oder CRF, Threads (0 = automatisch), Container
+OutputProfile = namedtuple(
+    'OutputProfile',
+    ['name', 'width', 'height', 'fps', 'codec', 'preset', 'bitrate', 'crf', 'threads', 'container',
+     'audio_codec', 'audio_bitrate'],
+)
+
+output_profiles = {
+    'tiktok': OutputProfile('tiktok', 1080, 1920, 24, 'libx264', 'veryfast', None, 20, 0, 'mp4', 'aac', '192k'),
+    'instagram_reel': OutputProfile('instagram_reel', 1080, 1920, 30, 'libx264', 'veryfast', '6M', None, 0, 'mp4', 'aac', '128k'),
+    'instagram_feed': OutputProfile('instagram_feed', 1080, 1350, 30, 'libx264', 'veryfast', '5M', None, 0, 'mp4', 'aac', '128k'),
+    'webm': OutputProfile('webm', 1080, 1920, 24, 'libvpx-vp9', None, '2M', None, 0, 'webm', 'libopus', '128k'),
+    # Schnelle Vorschau: halbe Auflösung, wenige Frames, schnellstes Preset
+    'draft': OutputProfile('draft', 540, 960, 12, 'libx264', 'ultrafast', None, 32, 0, 'mp4', 'aac', '64k'),
+}
+
+
+def get_profiles(names):
+    """Gibt die Profile zu einer Liste (oder kommagetrennten Zeichenkette) von Profilnamen zurück."""
+    if isinstance(names, str):
+        names = [name.strip() for name in names.split(',') if name.strip()]
+    unknown = [name for name in names if name not in output_profiles]
+    if unknown:
+        raise ValueError(f"Unbekannte Ausgabeprofile: {', '.join(unknown)} (verfügbar: {', '.join(output_profiles)})")
+    return [output_profiles[name] for name in names]
+
+
+def variant_path(output_path, profile, single=True):
+    """Gibt den Ausgabepfad eines Profils zurück (bei mehreren Profilen mit Profilnamen als Suffix)."""
+    root = os.path.splitext(output_path)[0]
+    if single:
+        return f'{root}.{profile.container}'
+    return f'{root}_{profile.name}.{profile.container}'
+
+
+##########################################################################################################
+
+########################################       ENCODE Section      ########################################
+
+##########################################################################################################
+
+
+def _video_arguments(profile, still):
+    """Baut die ffmpeg-Argumente für Videocodec, Skalierung und Container eines Profils."""
+    if profile.width and profile.height:
+        # Auf das Zielformat skalieren und überstehende Ränder abschneiden (wie "cover")
+        video_filter = (f'scale={profile.width}:{profile.height}:force_original_aspect_ratio=increase,'
+                        f'crop={profile.width}:{profile.height},setsar=1')
+    else:
+        # yuv420p braucht gerade Kantenlängen
+        video_filter = 'scale=trunc(iw/2)*2:trunc(ih/2)*2'
+
+    arguments = ['-c:v', profile.codec]
+    if profile.preset:
+        arguments += ['-preset', profile.preset]
+    if still and profile.codec == 'libx264':
+        arguments += ['-tune', 'stillimage']
+    if profile.bitrate:
+        arguments += ['-b:v', profile.bitrate]
+    elif profile.crf is not None:
+        arguments += ['-crf', str(profile.crf)]
+    if profile.threads:
+        arguments += ['-threads', str(profile.threads)]
+    arguments += ['-pix_fmt', 'yuv420p', '-r', str(profile.fps), '-vf', video_filter]
+    if profile.container == 'mp4':
+        arguments += ['-movflags', '+faststart']
+    return arguments
+
+
+def _encode_variant(input_arguments, output_path, profile, duration, audio_segment, still):
+    """Kodiert eine Eingabe (Standbild oder Master) mit einem Profil und muxt das fertige Audiosegment dazu."""
+    command = [get_setting('FFMPEG_BINARY'), '-y', '-loglevel', 'error'] + input_arguments
+    if audio_segment:
+        command += ['-i', audio_segment]
+    command += ['-t', str(duration)] + _video_arguments(profile, still)
+    if audio_segment:
+        # Das Segment ist bereits zugeschnitten und kodiert: nur kopieren, nicht neu kodieren
+        command += ['-map', '0:v:0', '-map', '1:a:0', '-c:a', 'copy']
+    command.append(output_path)
+
+    logger.info("Kodiere %s (%s)", output_path, profile.name)
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg konnte {output_path} nicht kodieren:\n{result.stderr}")
+    return output_path
+
+
+def _audio_segments(outputs, duration, audio_path, audio_offset):
+    """Holt für jede Kombination aus Audiocodec und Bitrate der Profile das Segment aus dem Audio-Cache."""
+    if not audio_path:
+        return {}
+    with timing.stage('audio'):
+        return {
+            (profile.audio_codec, profile.audio_bitrate): audio_cache.get_segment(
+                audio_path, duration, audio_offset, profile.audio_codec, profile.audio_bitrate
+            )
+            for profile, _ in outputs
+        }
+
+
+def _encode_variants(input_arguments, outputs, duration, audio_path, still, max_workers=None, audio_offset=0.0):
+    """Kodiert dieselbe Eingabe parallel in alle Profile (outputs: Liste aus (Profil, Pfad))."""
+    segments = _audio_segments(outputs, duration, audio_path, audio_offset)
+    with ThreadPoolExecutor(max_workers=max_workers or len(outputs)) as executor:
+        futures = [
+            executor.submit(
+                _encode_variant, input_arguments, output_path, profile, duration,
+                segments.get((profile.audio_codec, profile.audio_bitrate)), still
+            )
+            for profile, output_path in outputs
+        ]
+        errors = []
+        for future in futures:
+            try:
+                future.result()
+            except Exception as error:
+                errors.append(str(error))
+    if errors:
+        raise RuntimeError('\n'.join(errors))
+    return [output_path for _, output_path in outputs]
+
+
+def write_still_variants(frame, outputs, duration, audio_path=None, max_workers=None, audio_offset=0.0):
+    """Kodiert ein einzelnes RGB-Frame als Standbild-Video in alle Profile und mischt die Audiodatei dazu.
+
+    Statt jedes Frame in Python neu zusammenzusetzen, bekommt ffmpeg das fertige Bild einmal
+    und wiederholt es selbst (x264 mit "stillimage"-Tuning).
+    """
+    with tempfile.TemporaryDirectory() as temp_directory:
+        frame_path = os.path.join(temp_directory, 'frame.png')
+        # Niedrige Kompression: die Datei wird nur von ffmpeg gelesen
+        Image.fromarray(frame).convert('RGB').save(frame_path, compress_level=1)
+
+        # Das Bild nur einmal pro Sekunde einlesen; ffmpeg dupliziert das Frame danach auf die Ziel-fps
+        input_arguments = ['-loop', '1', '-framerate', '1', '-i', frame_path]
+        return _encode_variants(input_arguments, outputs, duration, audio_path, True, max_workers, audio_offset)
+
+
+def write_master_variants(video, outputs, fps, audio_path=None, max_workers=None, audio_offset=0.0):
+    """Setzt eine bewegte Komposition einmal (verlustfrei) zusammen und transkodiert sie parallel in alle Profile."""
+    with tempfile.TemporaryDirectory() as temp_directory:
+        master_path = os.path.join(temp_directory, 'master.mp4')
+        video.write_videofile(master_path, fps=fps, codec='libx264', preset='ultrafast',
+                              ffmpeg_params=['-crf', '0'], audio=False)
+        return _encode_variants(
+            ['-i', master_path], outputs, video.duration, audio_path, False, max_workers, audio_offset
+        )
+
+
+def write_variants(video, outputs, fps, audio_path=None, use_still_frame=True, max_workers=None, audio_offset=0.0):
+    """Rendert eine Komposition einmal und kodiert sie in alle Profile (outputs: Liste aus (Profil, Pfad)).
+
+    Die Tonspur kommt als vorkodiertes Segment (ab audio_offset) aus dem Audio-Cache.
+    """
+    if use_still_frame and is_static_composition(video):
+        # Nichts bewegt sich: die Ebenen einmal zu einem RGB-Frame zusammensetzen statt für jedes einzelne Frame
+        with timing.stage('flatten'):
+            frame = video.get_frame(0)
+        with timing.stage('encode'):
+            return write_still_variants(frame, outputs, video.duration, audio_path, max_workers, audio_offset)
+
+    # Stufe "encode": moviepy setzt jedes Frame einmal für den Master zusammen, ffmpeg kodiert die Profile
+    with timing.stage('encode'):
+        return write_master_variants(video, outputs, fps, audio_path, max_workers, audio_offset)
+
+
+##########################################################################################################
+
+########################################       STREAM Section      ########################################
+
+##########################################################################################################
+
+
+def slideshow_frames(slides, fps, slide_duration, crossfade=0.0):
+    """Erzeugt aus PIL-Slides die Frames eines Slideshow-Videos mit Standzeit und Überblendung.
+
+    Während der Standzeit wird dasselbe Array wiederholt geliefert; nur die Überblendungen erzeugen neue Frames.
+    """
+    hold = max(1, round(slide_duration * fps))
+    steps = round(crossfade * fps)
+    previous = None
+    for slide in slides:
+        frame = np.asarray(slide.convert('RGB'))
+        if previous is not None and steps:
+            start = previous.astype(np.float32)
+            difference = frame.astype(np.float32) - start
+            for step in range(1, steps + 1):
+                yield (start + difference * (step / (steps + 1))).astype(np.uint8)
+        for _ in range(hold):
+            yield frame
+        previous = frame
+
+
+def _prefetch(frames, buffer_size):
+    """Erzeugt Frames in einem Hintergrund-Thread vor; höchstens buffer_size Frames warten im Puffer.
+
+    Bricht der Verbraucher ab (z. B. weil ffmpeg vorzeitig beendet wurde), wird der Thread gestoppt und
+    der Puffer geleert, damit weder der Thread noch die gepufferten Frames liegen bleiben.
+    """
+    buffer = queue.Queue(maxsize=buffer_size)
+    done = object()
+    errors = []
+    stop = threading.Event()
+
+    def put(item):
+        # Mit Timeout, damit ein abgebrochener Verbraucher den Thread nicht für immer blockiert
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for frame in frames:
+                if not put(frame):
+                    break
+        except Exception as error:
+            errors.append(error)
+        finally:
+            if stop.is_set() and hasattr(frames, 'close'):
+                frames.close()
+            put(done)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            frame = buffer.get()
+            if frame is done:
+                break
+            yield frame
+    finally:
+        stop.set()
+        # Wartende Frames freigeben, damit ein blockiertes put sofort zurückkehrt
+        while True:
+            try:
+                buffer.get_nowait()
+            except queue.Empty:
+                break
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+def write_frame_stream(frames, output_path, profile, size, buffer_size=8, fps=None, audio_segment=None,
+                       duration=None):
+    """Kodiert RGB-Frames (NumPy, Höhe x Breite x 3) über eine Pipe direkt mit ffmpeg, ohne Zwischendateien.
+
+    Die Frames werden parallel zum Kodieren erzeugt; der Puffer dazwischen ist auf buffer_size begrenzt.
+    fps ist die Rate der gelieferten Frames (Standard: die des Profils); ein Audiosegment wird nur kopiert.
+    """
+    width, height = size
+    command = [
+        get_setting('FFMPEG_BINARY'), '-y', '-loglevel', 'error',
+        '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{width}x{height}', '-r', str(fps or profile.fps), '-i', '-',
+    ]
+    if audio_segment:
+        command += ['-i', audio_segment]
+    if duration:
+        command += ['-t', str(duration)]
+    command += _video_arguments(profile, False)
+    if audio_segment:
+        command += ['-map', '0:v:0', '-map', '1:a:0', '-c:a', 'copy']
+    command.append(output_path)
+
+    logger.info("Kodiere Frame-Strom nach %s (%s)", output_path, profile.name)
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    prefetched = _prefetch(frames, buffer_size)
+    try:
+        for frame in prefetched:
+            process.stdin.write(np.ascontiguousarray(frame, dtype=np.uint8).data)
+    except BrokenPipeError:
+        # ffmpeg hat abgebrochen; die Fehlermeldung steht in stderr
+        pass
+    finally:
+        # Stoppt den Vorab-Thread auch dann, wenn ffmpeg vorzeitig beendet wurde
+        prefetched.close()
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        stderr = process.stderr.read().decode('utf-8', errors='replace')
+        process.wait()
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg konnte {output_path} nicht kodieren:\n{stderr}")
+    return output_path
+
+
+def write_stream_variants(frames, size, fps, duration, outputs, audio_path=None, max_workers=None, audio_offset=0.0,
+                          buffer_size=8):
+    """Kodiert einen Frame-Strom in alle Profile (outputs: Liste aus (Profil, Pfad)).
+
+    Bei einem Profil gehen die Frames direkt in die endgültige Datei; bei mehreren werden sie einmal
+    in einen verlustfreien Master gestreamt, der dann parallel transkodiert wird.
+    """
+    if len(outputs) == 1:
+        profile, output_path = outputs[0]
+        segment = _audio_segments(outputs, duration, audio_path, audio_offset).get(
+            (profile.audio_codec, profile.audio_bitrate)
+        )
+        with timing.stage('encode'):
+            write_frame_stream(frames, output_path, profile, size, buffer_size, fps, segment, duration)
+        return [output_path]
+
+    master = OutputProfile('master', None, None, fps, 'libx264', 'ultrafast', None, 0, 0, 'mp4', None, None)
+    with tempfile.TemporaryDirectory() as temp_directory:
+        master_path = os.path.join(temp_directory, 'master.mp4')
+        with timing.stage('encode'):
+            write_frame_stream(frames, master_path, master, size, buffer_size, fps)
+            return _encode_variants(['-i', master_path], outputs, duration, audio_path, False, max_workers, audio_offset)